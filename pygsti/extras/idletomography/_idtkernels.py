@@ -0,0 +1,258 @@
+#***************************************************************************************************
+# Copyright 2015, 2019 National Technology & Engineering Solutions of Sandia, LLC (NTESS).
+# Under the terms of Contract DE-NA0003525 with NTESS, the U.S. Government retains certain rights
+# in this software.
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+# in compliance with the License.  You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0 or in the LICENSE file in the root pyGSTi directory.
+#***************************************************************************************************
+""" Numeric kernels for Idle Tomography, JIT-compiled with numba when it is available """
+
+import numpy as _np
+
+try:
+    import numba as _numba
+except ImportError:
+    _numba = None
+
+#Above this many errors, the numba kernel is run in parallel over errors
+PARALLEL_THRESHOLD = 1024
+
+
+def _affine_rows_loops(qubit_table, err_indices, out_bits):
+    """ Loop-based kernel behind the affine half of :function:`jac_rows`, written to be compiled by numba """
+    n_out, nqubits = out_bits.shape
+    n_err = err_indices.shape[0]
+    rows = _np.zeros((n_out, n_err), _np.int64)
+    for e in _prange(n_err):
+        for j in range(n_out):
+            val = 1
+            for q in range(nqubits):
+                val *= qubit_table[q, err_indices[e, q], out_bits[j, q]]
+                if val == 0: break
+            rows[j, e] = val
+    return rows
+
+
+def _affine_rows_numpy(qubit_table, err_indices, out_bits):
+    """ Vectorized-numpy version of :function:`_affine_rows_loops`, used when numba isn't available """
+    qubits = _np.arange(err_indices.shape[1])
+    rows = _np.empty((out_bits.shape[0], err_indices.shape[0]), _np.int64)
+    for j in range(out_bits.shape[0]):
+        rows[j, :] = _np.prod(qubit_table[qubits, err_indices, out_bits[j]], axis=1)
+    return rows
+
+
+if _numba is not None:
+    _prange = _numba.prange
+    _affine_rows_serial = _numba.njit(cache=True, nogil=True)(_affine_rows_loops)
+    _affine_rows_parallel = _numba.njit(cache=True, nogil=True, parallel=True)(_affine_rows_loops)
+else:
+    _prange = range
+    _affine_rows_serial = _affine_rows_parallel = _affine_rows_numpy
+
+
+def _match_rows(rows, targets):
+    """ The index of the row of `targets` equal to each row of `rows`, or -1 when there isn't one """
+    uniq, inverse = _np.unique(_np.concatenate((targets, rows), axis=0), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    target_of_uniq = _np.full(len(uniq), -1, _np.intp)
+    target_of_uniq[inverse[0:len(targets)][::-1]] = _np.arange(len(targets))[::-1]  # first match wins
+    return target_of_uniq[inverse[len(targets):]]
+
+
+def jac_rows(err_xbits, err_zbits, p_xbits, p_zbits, sdiff, out_packed, out_bits,
+             qubit_table, err_indices, include_affine):
+    """
+    Computes the stochastic (and optionally affine) Jacobian rows for a set of outcomes.
+
+    All arguments are numeric arrays, precomputed once per set of errors or
+    once per fiducial pair, so that the inner kernels can be JIT-compiled.
+
+    Parameters
+    ----------
+    err_xbits, err_zbits : numpy.ndarray
+        `uint8` arrays of shape `(nErrors, nBytes)` giving the packed
+        symplectic encoding of the errors.
+
+    p_xbits, p_zbits : numpy.ndarray
+        `uint8` arrays of shape `(nBytes,)` giving the packed symplectic
+        encoding of the prep/meas basis.
+
+    sdiff : numpy.ndarray
+        `uint8` array of shape `(nBytes,)` with the packed bits of the qubits
+        whose prep and meas signs differ.
+
+    out_packed, out_bits : numpy.ndarray
+        `uint8` arrays of shape `(nOutcomes, nBytes)` and `(nOutcomes, N)`
+        giving the (distinct) outcome bit strings in packed and unpacked form.
+
+    qubit_table : numpy.ndarray
+        An integer array of shape `(N, 4, 2)` giving each qubit's affine
+        factor, indexed by `[qubit, error_pauli, outcome_bit]`.
+
+    err_indices : numpy.ndarray
+        An integer array of shape `(nErrors, N)` giving the Pauli index
+        (0=I, 1=X, 2=Y, 3=Z) of each qubit's Pauli for each error.
+
+    include_affine : bool
+        Whether the affine half of each row is computed.
+
+    Returns
+    -------
+    numpy.ndarray
+        An integer array of shape `(nOutcomes, nErrors)`, or `(nOutcomes, 2*nErrors)`
+        when `include_affine` is True (stochastic columns first).
+    """
+    n_err = err_xbits.shape[0]
+    rows = _np.zeros((out_packed.shape[0], 2 * n_err if include_affine else n_err), _np.int64)
+
+    #Each error causes exactly one outcome, so scatter a 1 into that outcome's row (if it's one of `out_packed`).
+    # A qubit's outcome bit is set when exactly one of "basis anticommutes with error" and
+    # "prep & meas signs differ" holds (see `stochastic_outcome`).
+    err_outcomes = (p_xbits & err_zbits) ^ (p_zbits & err_xbits) ^ sdiff
+    out_of_err = _match_rows(err_outcomes, out_packed)
+    errs = _np.nonzero(out_of_err >= 0)[0]
+    rows[out_of_err[errs], errs] = 1
+
+    if include_affine:
+        #An affine element is structurally zero when, on some qubit, the error's Pauli has only
+        # zero factors (it isn't 'I' or the basis Pauli), so only compute products for the other errors.
+        allowed = _np.any(qubit_table != 0, axis=2)  # [qubit, error_pauli]
+        errs = _np.nonzero(_np.all(allowed[_np.arange(err_indices.shape[1]), err_indices], axis=1))[0]
+        kernel = _affine_rows_parallel if len(errs) > PARALLEL_THRESHOLD else _affine_rows_serial
+        rows[:, n_err + errs] = kernel(qubit_table, _np.ascontiguousarray(err_indices[errs]), out_bits)
+    return rows
+
+
+def _ham_rows_loops(prep_codes, prep_signs, obs_codes, obs_signs, err_indices):
+    """ Loop-based kernel behind :function:`ham_rows`, written to be compiled by numba """
+    n_obs, nqubits = obs_codes.shape
+    n_err = err_indices.shape[0]
+    rows = _np.zeros((n_obs, n_err), _np.float64)
+    for k in _prange(n_obs * n_err):  # flattened so work is balanced when run in parallel
+        j = k // n_err; e = k % n_err
+        n_anti = 0; n_minus = 0; nonzero = True
+        for q in range(nqubits):
+            err_code = int(err_indices[e, q]); obs_code = int(obs_codes[j, q])
+            R = err_code ^ obs_code
+            if R != 0 and R != prep_codes[q]:
+                nonzero = False
+                break
+            if err_code != 0 and obs_code != 0 and err_code != obs_code:
+                n_anti += 1
+                if (obs_code - err_code) % 3 != 1: n_minus += 1
+            if R != 0 and prep_signs[q] == -1: n_minus += 1
+        if nonzero and n_anti % 2 == 1:
+            n_minus += (n_anti + 1) // 2
+            rows[j, e] = obs_signs[j] * (1.0 - 2.0 * (n_minus % 2))
+    return rows
+
+
+def _ham_rows_numpy(prep_codes, prep_signs, obs_codes, obs_signs, err_indices):
+    """ Vectorized-numpy version of :function:`_ham_rows_loops`, used when numba isn't available """
+    rows = _np.empty((obs_codes.shape[0], err_indices.shape[0]), _np.float64)
+    for j, (obs, obs_sign) in enumerate(zip(obs_codes, obs_signs)):
+        anticommutes = (err_indices != 0) & (obs != 0) & (err_indices != obs)
+        n_anti = _np.count_nonzero(anticommutes, axis=1)
+        R = err_indices ^ obs
+        nonzero = (n_anti % 2 == 1) & _np.all((R == 0) | (R == prep_codes), axis=1)
+        n_minus = (n_anti + 1) // 2 \
+            + _np.count_nonzero(anticommutes & ((obs.astype(int) - err_indices) % 3 != 1), axis=1) \
+            + _np.count_nonzero((R != 0) & (prep_signs == -1), axis=1)
+        rows[j, :] = _np.where(nonzero, obs_sign * (1.0 - 2.0 * (n_minus % 2)), 0.0)
+    return rows
+
+
+def _affine_obs_rows_loops(qubit_tables, err_indices):
+    """ Loop-based kernel behind :function:`affine_obs_rows`, written to be compiled by numba """
+    n_obs, nqubits = qubit_tables.shape[0:2]
+    n_err = err_indices.shape[0]
+    rows = _np.zeros((n_obs, n_err), _np.int64)
+    for k in _prange(n_obs * n_err):
+        j = k // n_err; e = k % n_err
+        val = 1
+        for q in range(nqubits):
+            val *= qubit_tables[j, q, err_indices[e, q]]
+            if val == 0: break
+        rows[j, e] = val
+    return rows
+
+
+def _affine_obs_rows_numpy(qubit_tables, err_indices):
+    """ Vectorized-numpy version of :function:`_affine_obs_rows_loops`, used when numba isn't available """
+    qubits = _np.arange(err_indices.shape[1])
+    return _np.array([_np.prod(qubit_table[qubits, err_indices], axis=1, dtype=_np.int64)
+                      for qubit_table in qubit_tables], _np.int64).reshape(len(qubit_tables), len(err_indices))
+
+
+if _numba is not None:
+    _ham_rows_serial = _numba.njit(cache=True, nogil=True)(_ham_rows_loops)
+    _ham_rows_parallel = _numba.njit(cache=True, nogil=True, parallel=True)(_ham_rows_loops)
+    _affine_obs_rows_serial = _numba.njit(cache=True, nogil=True)(_affine_obs_rows_loops)
+    _affine_obs_rows_parallel = _numba.njit(cache=True, nogil=True, parallel=True)(_affine_obs_rows_loops)
+else:
+    _ham_rows_serial = _ham_rows_parallel = _ham_rows_numpy
+    _affine_obs_rows_serial = _affine_obs_rows_parallel = _affine_obs_rows_numpy
+
+
+def ham_rows(prep_codes, prep_signs, obs_codes, obs_signs, err_indices):
+    """
+    Computes the Hamiltonian Jacobian rows of a set of observables.
+
+    Element `(j, e)` is the Hamiltonian Jacobian element of the `j`-th
+    observable with respect to the `e`-th (+-signed) error, i.e. `i[Err,Obs]/2`
+    dotted into the prepared state.
+
+    Parameters
+    ----------
+    prep_codes, prep_signs : numpy.ndarray
+        Length-`N` integer arrays giving the prepared state's Pauli codes
+        (1=X, 2=Y, 3=Z) and signs.
+
+    obs_codes : numpy.ndarray
+        An integer array of shape `(nObservables, N)` giving the observables'
+        Pauli codes (0=I, 1=X, 2=Y, 3=Z).
+
+    obs_signs : numpy.ndarray
+        A length-`nObservables` array of the observables' +/-1 signs.
+
+    err_indices : numpy.ndarray
+        An integer array of shape `(nErrors, N)` giving the errors' Pauli codes.
+
+    Returns
+    -------
+    numpy.ndarray
+        A float array of shape `(nObservables, nErrors)`.
+    """
+    # With Pauli codes I=0, X=1, Y=2, Z=3, the product of two Paulis is (up to a phase) the XOR of their codes.
+    # i[Err,Obs]/2 is nonzero only when an odd number `a` of qubits anticommute, when it equals
+    # (-1)^((a+1)/2) * (product of per-qubit product signs) * R, where R is the XOR'd Pauli string
+    # and the per-qubit sign is -1 for anticommuting pairs not in cyclic (XY, YZ, ZX) order
+    # (see `NQPauliOp.icommutator_over_2`).  R.statedot(prep) is then nonzero only when each R_q
+    # is I or prep's basis, and picks up a -1 for each non-I R_q whose prep sign is -1.
+    kernel = _ham_rows_parallel if err_indices.shape[0] > PARALLEL_THRESHOLD else _ham_rows_serial
+    return kernel(prep_codes, prep_signs, obs_codes, obs_signs, err_indices)
+
+
+def affine_obs_rows(qubit_tables, err_indices):
+    """
+    Computes the affine Jacobian rows of a set of observables.
+
+    Parameters
+    ----------
+    qubit_tables : numpy.ndarray
+        An integer array of shape `(nObservables, N, 4)` giving each
+        observable's per-qubit affine factors, indexed by
+        `[observable, qubit, error_pauli]`.
+
+    err_indices : numpy.ndarray
+        An integer array of shape `(nErrors, N)` giving the errors' Pauli codes.
+
+    Returns
+    -------
+    numpy.ndarray
+        An integer array of shape `(nObservables, nErrors)`.
+    """
+    kernel = _affine_obs_rows_parallel if err_indices.shape[0] > PARALLEL_THRESHOLD else _affine_obs_rows_serial
+    return kernel(qubit_tables, err_indices)
@@ -9,14 +9,18 @@
 """ Core Idle Tomography routines """
 
 import collections as _collections
+import concurrent.futures as _futures
 import itertools as _itertools
 import time as _time
 import warnings as _warnings
 
 import numpy as _np
+import scipy.linalg as _spl
+import scipy.sparse as _sps
 
 from . import idttools as _idttools
 from . import pauliobjs as _pobjs
+from . import _idtkernels
 from .idtresults import IdleTomographyResults as _IdleTomographyResults
 from ... import baseobjs as _baseobjs
 from ... import models as _models
@@ -66,6 +70,38 @@ def hamiltonian_jac_element(prep, error, observable):
     return 0 if (com is None) else com.statedot(prep)
 
 
+def _hamiltonian_jac_rows(prep, observables, err_indices):
+    """
+    Computes the Hamiltonian Jacobian elements of several observables for many errors at once.
+
+    This is equivalent to evaluating `hamiltonian_jac_element(prep, err, obs)`
+    for every `obs` in `observables` and every (+-signed) error encoded by `err_indices`.
+
+    Parameters
+    ----------
+    prep : NQPauliState
+        The state that is prepared.
+
+    observables : list
+        A list of :class:`NQPauliOp` observables, one per returned row.
+
+    err_indices : numpy.ndarray
+        An integer array of shape `(nErrors, N)` giving the integer code
+        of each qubit's Pauli for each error (the errors' `rep_arr`s).
+
+    Returns
+    -------
+    numpy.ndarray
+        A float array of shape `(len(observables), nErrors)`.
+    """
+    obs_codes = _np.array([obs.rep_arr for obs in observables], _np.int8).reshape(len(observables), len(prep))
+    obs_signs = _np.array([obs.sign for obs in observables], _np.int64)
+    return _idtkernels.ham_rows(prep.rep_arr, prep.signs_arr, obs_codes, obs_signs, err_indices)
+
+
+_ZERO_CHAR, _ONE_CHAR = ord('0'), ord('1')
+
+
 def stochastic_outcome(prep, error, meas):
     """
     Computes the "expected" outcome when the stochastic error `error`
@@ -109,16 +145,88 @@ def stochastic_outcome(prep, error, meas):
     # if {Err,P} = 0, then the opposite is true: '+'/'0' branch is nonzero
     #   when s1!=s2, etc.
     # Takeaway: if basis (P) commutes with Err then outcome is '0' if s1==s2, "1" otherwise ...
-    outcome_str = ""
-    for s1, P1, s2, P2, Err in zip(prep.signs, prep.rep, meas.signs, meas.rep, error.rep):
+    outcome_buf = bytearray(b"0" * len(prep.rep))  # filled in place (avoids repeated str concatenation)
+    for i, (s1, P1, s2, P2, Err) in enumerate(zip(prep.signs, prep.rep, meas.signs, meas.rep, error.rep)):
         assert(P1 == P2), "Stochastic outcomes must prep & measure along same bases!"
         P = P1  # ( = P2)
         if _pobjs._commute_parity(P, Err) == 1:  # commutes: [P,Err] == 0
-            outcome_str += "0" if (s1 == s2) else "1"
+            outcome_buf[i] = _ZERO_CHAR if (s1 == s2) else _ONE_CHAR
         else:  # anticommutes: {P,Err} == 0
-            outcome_str += "1" if (s1 == s2) else "0"
+            outcome_buf[i] = _ONE_CHAR if (s1 == s2) else _ZERO_CHAR
+
+    return _pobjs.NQOutcome(outcome_buf.decode('ascii'))
+
 
-    return _pobjs.NQOutcome(outcome_str)
+# Symplectic (X-part, Z-part) encoding of single-qubit Paulis: X=(1,0), Y=(1,1), Z=(0,1)
+# (indexed by the Pauli's integer code, see `_pobjs.PAULI_CODES`)
+_SYMPLECTIC_XBIT = _np.array([0, 1, 1, 0], _np.uint8)
+_SYMPLECTIC_ZBIT = _np.array([0, 0, 1, 1], _np.uint8)
+
+
+def _symplectic_bitmasks(rep_arrs):
+    """
+    Packs N-qubit Paulis into symplectic bit masks.
+
+    Parameters
+    ----------
+    rep_arrs : numpy.ndarray
+        An integer array of shape `(nPaulis, N)` holding the Paulis' integer
+        codes (i.e. their `rep_arr` attributes stacked).
+
+    Returns
+    -------
+    xbits, zbits : numpy.ndarray
+        `uint8` arrays of shape `(nPaulis, ceil(N/8))` holding the X- and
+        Z-parts of each Pauli, 8 qubits per byte (see `numpy.packbits`).
+    """
+    return _np.packbits(_SYMPLECTIC_XBIT[rep_arrs], axis=1), _np.packbits(_SYMPLECTIC_ZBIT[rep_arrs], axis=1)
+
+
+def _jac_rows(prep, meas, outcomes, err_xbits, err_zbits, err_indices, include_affine):
+    """
+    Computes the stochastic (and affine) Jacobian rows for all `outcomes` and all errors at once.
+
+    This is equivalent to (but much faster than) evaluating
+    `stochastic_jac_element(prep, err, meas, out)` (and `affine_jac_element(...)`)
+    for every `out` in `outcomes` and every error encoded by `err_xbits`,
+    `err_zbits` and `err_indices`.
+
+    Parameters
+    ----------
+    prep, meas : NQPauliState
+        The prepared state and measured basis (must be the same basis).
+
+    outcomes : list
+        A list of distinct :class:`NQOutcome` objects, one per returned row.
+
+    err_xbits, err_zbits : numpy.ndarray
+        The packed symplectic encoding of the errors, as returned by
+        :function:`_symplectic_bitmasks`.
+
+    err_indices : numpy.ndarray
+        An integer array of shape `(nErrors, N)` giving the integer code
+        of each qubit's Pauli for each error (the errors' `rep_arr`s).
+
+    include_affine : bool
+        Whether to append the affine Jacobian elements to each row.
+
+    Returns
+    -------
+    numpy.ndarray
+        An integer array of shape `(len(outcomes), nErrors)`, or
+        `(len(outcomes), 2*nErrors)` when `include_affine` is True.
+    """
+    assert(list(prep.rep) == list(meas.rep)), "Stochastic outcomes must prep & measure along same bases!"
+    assert(len(set([out.rep for out in outcomes])) == len(outcomes)), "`outcomes` must be distinct!"
+    p_xbits, p_zbits = _symplectic_bitmasks(prep.rep_arr[None, :])
+    sdiff = _np.packbits(prep.signs_arr != meas.signs_arr)
+    out_bits = _np.array([_bit_indices(out.rep) for out in outcomes], _np.uint8).reshape(len(outcomes), len(prep))
+    # per-qubit affine factors indexed by [qubit, error_pauli, bit] for this prep & meas
+    qubit_table = _AFFINE_JAC_TABLE[_sign_indices(prep.signs_arr), _sign_indices(meas.signs_arr),
+                                    prep.rep_arr - 1]
+    return _idtkernels.jac_rows(err_xbits, err_zbits, p_xbits[0], p_zbits[0], sdiff,
+                                _np.packbits(out_bits, axis=1), out_bits, qubit_table, err_indices,
+                                bool(include_affine))
 
 
 # Now we can define the functions that do the real work for stochastic tomography.
@@ -152,6 +260,107 @@ def stochastic_jac_element(prep, error, meas, outcome):
     return 1 if (stochastic_outcome(prep, error, meas) == outcome) else 0
 
 
+def _affine_factor(prep_sign, prep_basis, error_pauli, meas_sign, meas_basis, outcome_bit):
+    """
+    Answers this question:
+    If a qubit is prepped in state (prep_sign,prep_basis) & measured
+    using POVM (meas_sign,meas_basis), and experiences an affine error given
+    (at this qubit) by Pauli "error_pauli", then at what rate does that change probability of outcome "bit"?
+    This is going to get multiplied over all qubits.  A zero indicates that the affine error is orthogonal
+    to the measurement basis, which means the probability of *all* outcomes including this bit are unaffected.
+
+    Returns 0, +1, or -1.
+    """
+    # Specifically, this computes Tr( (I+/-P) AffErr[ (I+/-P) ] ) where the two
+    # P's represent the prep & measure bases (and can be different).  Here AffErr
+    # outputs ErrP if ErrP != 'I', otherwise it's just the identity map (see above).
+    #
+    # Thus, when ErrP != 'I', we have Tr( (I+/-P) ErrP ) which equals 0 whenever
+    # ErrP != P and +/-1 if ErrP == P.  The sign equals meas_sign when outcome_bit == "0",
+    # and is reversed when it == "1".
+    # When ErrP == 'I', we have Tr( (I+/-P) (I+/-P) ) = Tr( I + sign*I)
+    #  = 1 where sign = prep_sign*meas_sign when outcome == "0" and -1 times
+    #      this when == "1".
+    #  = 0 otherwise
+
+    assert(prep_basis in ("X", "Y", "Z"))  # 'I', for instance, is invalid
+    assert(meas_basis in ("X", "Y", "Z"))  # 'I', for instance, is invalid
+    assert(prep_basis == meas_basis)  # always true
+    outsign = 1 if (outcome_bit == "0") else -1  # b/c we often just flip a sign when == "1"
+    # i.e. the sign used in I+/-P for measuring is meas_sign * outsign
+
+    if error_pauli == 'I':  # special case: no affine action on this space
+        if prep_basis == meas_basis:
+            return 1 if (prep_sign * meas_sign * outsign == 1) else 0
+        else: return 1  # bases don't match
+
+    if meas_basis != error_pauli:  # then they don't commute (b/c neither can be 'I')
+        return 0  # so there's no change along this axis (see docstring)
+    else:  # meas_basis == error_pauli != 'I'
+        if outcome_bit == "0": return meas_sign
+        else: return meas_sign * -1
+
+
+def _affine_obs_factor(prep_sign, prep_basis, error_pauli, obs_pauli):
+    """
+    The single-qubit factor of :function:`affine_jac_obs_element`.
+
+    Returns 0, +1, -1, or 2.
+    """
+    assert(prep_basis in ("X", "Y", "Z"))  # 'I', for instance, is invalid
+
+    # want Tr(obs_pauli * AffErr[ I+/-P ] ).  There are several cases:
+    # 1) if obs_pauli == 'I':
+    #   - if error_pauli == 'I' (so AffErr = Id), Tr(I +/- P) == 1 always
+    #   - if error_pauli != 'I', Tr(ErrP) == 0 since ErrP != 'I'
+    # 2) if obs_pauli != 'I' (so Tr(obs_pauli) == 0)
+    #   - if error_pauli == 'I', Tr(obs_pauli * (I +/- P)) = prep_sign if (obs_pauli == prep_basis) else 0
+    #   - if error_pauli != 'I', Tr(obs_pauli * error_pauli) = 1 if (obs_pauli == error_pauli) else 0
+    #      (and actually this counts at 2 instead of 1 b/c obs isn't normalized (I think?))
+
+    if obs_pauli == 'I':
+        return 1 if (error_pauli == 'I') else 0
+    elif error_pauli == 'I':
+        return prep_sign if (prep_basis == obs_pauli) else 0
+    else:
+        return 2 if (obs_pauli == error_pauli) else 0
+
+
+# The single-qubit affine factors only depend on a handful of discrete inputs, so they're
+# tabulated once here and looked up (and multiplied together) for each jacobian element.
+# Index conventions: signs +1/-1 -> 0/1, bases X/Y/Z -> 0/1/2, Paulis I/X/Y/Z -> 0/1/2/3,
+# and outcome bits "0"/"1" -> 0/1.
+_PAULI_INDEX = _pobjs.PAULI_CODES
+
+
+def _tabulate_affine_factors():
+    """ Builds the `_AFFINE_JAC_TABLE` and `_AFFINE_OBS_JAC_TABLE` lookup tables """
+    jac_table = _np.zeros((2, 2, 3, 4, 2), _np.int8)  # [prep_sign, meas_sign, basis, error_pauli, bit]
+    obs_jac_table = _np.zeros((2, 3, 4, 4), _np.int8)  # [prep_sign, prep_basis, error_pauli, obs_pauli]
+    for (si, s), (bi, B), (ei, E) in _itertools.product(enumerate((1, -1)), enumerate('XYZ'), enumerate('IXYZ')):
+        for oi, O in enumerate('IXYZ'):
+            obs_jac_table[si, bi, ei, oi] = _affine_obs_factor(s, B, E, O)
+        for mi, m in enumerate((1, -1)):
+            for bit in (0, 1):
+                jac_table[si, mi, bi, ei, bit] = _affine_factor(s, B, E, m, B, str(bit))
+    return jac_table, obs_jac_table
+
+
+_AFFINE_JAC_TABLE, _AFFINE_OBS_JAC_TABLE = _tabulate_affine_factors()
+# nested-list copies for fast scalar lookups in the single-element functions
+_AFFINE_JAC_LISTS, _AFFINE_OBS_JAC_LISTS = _AFFINE_JAC_TABLE.tolist(), _AFFINE_OBS_JAC_TABLE.tolist()
+
+
+def _sign_indices(signs):
+    """ Integer array with 0 for each +1 and 1 for each -1 sign in `signs` """
+    return (_np.asarray(signs) != 1).astype(_np.intp)
+
+
+def _bit_indices(rep):
+    """ Integer array of the bits (as ints) of a "0"/"1" outcome string """
+    return _np.array([0 if (b == '0') else 1 for b in rep], _np.intp)
+
+
 def affine_jac_element(prep, error, meas, outcome):
     """
     Computes the Jacobian matrix element for a Affine error: how the
@@ -185,50 +394,15 @@ def affine_jac_element(prep, error, meas, outcome):
     #   rho -> (Id[rho] + eps*AffZI[rho]) = rho + eps*ZI
     #   where ZI = diag(1,1,-1,-1), so this adds prob to 00 and 01 and removes from 10 and 11.
     # Instead it means the map AffZ x Id where AffZ : rho -> rho + eps Z and Id : rho -> rho.
-
-    def _affhelper(prep_sign, prep_basis, error_pauli, meas_sign, meas_basis, outcome_bit):
-        """
-        Answers this question:
-        If a qubit is prepped in state (prep_sign,prep_basis) & measured
-        using POVM (meas_sign,meas_basis), and experiences an affine error given
-        (at this qubit) by Pauli "error_pauli", then at what rate does that change probability of outcome "bit"?
-        This is going to get multiplied over all qubits.  A zero indicates that the affine error is orthogonal
-        to the measurement basis, which means the probability of *all* outcomes including this bit are unaffected.
-
-        Returns 0, +1, or -1.
-        """
-        # Specifically, this computes Tr( (I+/-P) AffErr[ (I+/-P) ] ) where the two
-        # P's represent the prep & measure bases (and can be different).  Here AffErr
-        # outputs ErrP if ErrP != 'I', otherwise it's just the identity map (see above).
-        #
-        # Thus, when ErrP != 'I', we have Tr( (I+/-P) ErrP ) which equals 0 whenever
-        # ErrP != P and +/-1 if ErrP == P.  The sign equals meas_sign when outcome_bit == "0",
-        # and is reversed when it == "1".
-        # When ErrP == 'I', we have Tr( (I+/-P) (I+/-P) ) = Tr( I + sign*I)
-        #  = 1 where sign = prep_sign*meas_sign when outcome == "0" and -1 times
-        #      this when == "1".
-        #  = 0 otherwise
-
-        assert(prep_basis in ("X", "Y", "Z"))  # 'I', for instance, is invalid
-        assert(meas_basis in ("X", "Y", "Z"))  # 'I', for instance, is invalid
-        assert(prep_basis == meas_basis)  # always true
-        outsign = 1 if (outcome_bit == "0") else -1  # b/c we often just flip a sign when == "1"
-        # i.e. the sign used in I+/-P for measuring is meas_sign * outsign
-
-        if error_pauli == 'I':  # special case: no affine action on this space
-            if prep_basis == meas_basis:
-                return 1 if (prep_sign * meas_sign * outsign == 1) else 0
-            else: return 1  # bases don't match
-
-        if meas_basis != error_pauli:  # then they don't commute (b/c neither can be 'I')
-            return 0  # so there's no change along this axis (see docstring)
-        else:  # meas_basis == error_pauli != 'I'
-            if outcome_bit == "0": return meas_sign
-            else: return meas_sign * -1
-
-    return _np.prod([_affhelper(s1, P1, Err, s2, P2, o) for s1, P1, s2, P2, Err, o
-                     in zip(prep.signs, prep.rep, meas.signs, meas.rep,
-                            error.rep, outcome.rep)])
+    # The per-qubit factors are given by `_affine_factor` (tabulated in `_AFFINE_JAC_TABLE`).
+    assert(list(prep.rep) == list(meas.rep)), "Affine jacobian elements must prep & measure along same bases!"
+    ret = 1
+    for s1, s2, P, Err, bit in zip(prep.signs, meas.signs, prep.rep, error.rep, outcome.rep):
+        val = _AFFINE_JAC_LISTS[0 if (s1 == 1) else 1][0 if (s2 == 1) else 1][_PAULI_INDEX[P] - 1][
+            _PAULI_INDEX[Err]][0 if (bit == '0') else 1]
+        if val == 0: return 0  # many elements are zero, so exit early
+        ret *= val
+    return ret
 
 
 def affine_jac_obs_element(prep, error, observable):
@@ -262,29 +436,34 @@ def affine_jac_obs_element(prep, error, observable):
     # (observable should be equal to meas when it's not equal to 'I', up to sign)
 
     # Note: as in affine_jac_element, 'I's in error mean that this affine error
-    # doesn't act (acts as the identity) on that qubit.
-
-    def _affhelper(prep_sign, prep_basis, error_pauli, obs_pauli):
-        assert(prep_basis in ("X", "Y", "Z"))  # 'I', for instance, is invalid
-
-        # want Tr(obs_pauli * AffErr[ I+/-P ] ).  There are several cases:
-        # 1) if obs_pauli == 'I':
-        #   - if error_pauli == 'I' (so AffErr = Id), Tr(I +/- P) == 1 always
-        #   - if error_pauli != 'I', Tr(ErrP) == 0 since ErrP != 'I'
-        # 2) if obs_pauli != 'I' (so Tr(obs_pauli) == 0)
-        #   - if error_pauli == 'I', Tr(obs_pauli * (I +/- P)) = prep_sign if (obs_pauli == prep_basis) else 0
-        #   - if error_pauli != 'I', Tr(obs_pauli * error_pauli) = 1 if (obs_pauli == error_pauli) else 0
-        #      (and actually this counts at 2 instead of 1 b/c obs isn't normalized (I think?))
-
-        if obs_pauli == 'I':
-            return 1 if (error_pauli == 'I') else 0
-        elif error_pauli == 'I':
-            return prep_sign if (prep_basis == obs_pauli) else 0
-        else:
-            return 2 if (obs_pauli == error_pauli) else 0
+    # doesn't act (acts as the identity) on that qubit.  The per-qubit factors are
+    # given by `_affine_obs_factor` (tabulated in `_AFFINE_OBS_JAC_TABLE`).
+    ret = 1
+    for s1, P, Err, Obs in zip(prep.signs, prep.rep, error.rep, observable.rep):
+        val = _AFFINE_OBS_JAC_LISTS[0 if (s1 == 1) else 1][_PAULI_INDEX[P] - 1][_PAULI_INDEX[Err]][_PAULI_INDEX[Obs]]
+        if val == 0: return 0  # many elements are zero, so exit early
+        ret *= val
+    return ret
+
+
+def _affine_obs_jac_rows(prep, observables, err_indices):
+    """
+    Computes the affine Jacobian elements of several observables for many errors at once.
 
-    return _np.prod([_affhelper(s1, P1, Err, o) for s1, P1, Err, o
-                     in zip(prep.signs, prep.rep, error.rep, observable.rep)])
+    This is equivalent to evaluating `affine_jac_obs_element(prep, err, obs)` for every
+    `obs` in `observables` and every error encoded by `err_indices` (see
+    :function:`_hamiltonian_jac_rows`).
+
+    Returns
+    -------
+    numpy.ndarray
+        An integer array of shape `(len(observables), nErrors)`.
+    """
+    obs_codes = _np.array([obs.rep_arr for obs in observables], _np.intp).reshape(len(observables), len(prep))
+    # per-qubit factors indexed by [observable, qubit, error_pauli] for this prep
+    qubit_tables = _AFFINE_OBS_JAC_TABLE[_sign_indices(prep.signs_arr)[None, :], prep.rep_arr[None, :] - 1, :,
+                                         obs_codes]
+    return _idtkernels.affine_obs_rows(qubit_tables, err_indices)
 
 
 # -----------------------------------------------------------------------------
@@ -339,9 +518,11 @@ def idle_tomography_fidpairs(nqubits, maxweight=2, include_hamiltonian=True,
 
     #convert +'s and -'s to dictionaries of +/-1 used later:
     def conv(x): return 1 if x == "+" else -1
-    base_prep_signs = {l: conv(s) for l, s in zip(('X', 'Y', 'Z'), preferred_prep_basis_signs)}
-    base_meas_signs = {l: conv(s) for l, s in zip(('X', 'Y', 'Z'), preferred_meas_basis_signs)}
-    #these dicts give the preferred sign for prepping or measuring along each 1Q axis.
+    base_prep_signs_arr = [conv(s) for s in preferred_prep_basis_signs]
+    base_meas_signs_arr = [conv(s) for s in preferred_meas_basis_signs]
+    base_prep_signs = {l: s for l, s in zip(('X', 'Y', 'Z'), base_prep_signs_arr)}
+    base_meas_signs = {l: s for l, s in zip(('X', 'Y', 'Z'), base_meas_signs_arr)}
+    #these give the preferred sign for prepping or measuring along each 1Q axis (X,Y,Z order in the lists).
 
     if include_stochastic:
         if include_affine:
@@ -364,17 +545,18 @@ def idle_tomography_fidpairs(nqubits, maxweight=2, include_hamiltonian=True,
 
         #Build up "template" of 2-tuples of NQPauliState objects acting on
         # maxweight qubits that should be tiled to full fiducial pairs.
-        sto_tmpl_pairs = []
-        for fliptup in flips:  # elements of flips must have length=maxweight
-
-            # Create a set of "template" fiducial pairs using the current flips
-            for basisLets in _itertools.product(('X', 'Y', 'Z'), repeat=maxweight):
-
-                # flip base (preferred) basis signs as instructed by fliptup
-                prep_signs = [f * base_prep_signs[l] for f, l in zip(fliptup, basisLets)]
-                meas_signs = [f * base_meas_signs[l] for f, l in zip(fliptup, basisLets)]
-                sto_tmpl_pairs.append((_pobjs.NQPauliState(''.join(basisLets), prep_signs),
-                                       _pobjs.NQPauliState(''.join(basisLets), meas_signs)))
+        # All the (flip, basis) sign combinations are computed at once: basis_indices[b] holds the
+        # X,Y,Z = 0,1,2 indices of the b-th basis, and the signs arrays are indexed by [flip, basis, qubit].
+        basis_indices = _np.array(list(_itertools.product(range(3), repeat=maxweight)), int)
+        flips_arr = _np.array(flips, int)  # elements of flips must have length=maxweight
+        prep_signs = flips_arr[:, None, :] * _np.array(base_prep_signs_arr)[basis_indices][None, :, :]
+        meas_signs = flips_arr[:, None, :] * _np.array(base_meas_signs_arr)[basis_indices][None, :, :]
+        basis_strs = [''.join([('X', 'Y', 'Z')[k] for k in row]) for row in basis_indices]
+
+        # flip base (preferred) basis signs as instructed by each element of flips
+        sto_tmpl_pairs = [(_pobjs.NQPauliState(basis_strs[b], prep_signs[f, b].tolist()),
+                           _pobjs.NQPauliState(basis_strs[b], meas_signs[f, b].tolist()))
+                          for f in range(len(flips)) for b in range(len(basis_strs))]
 
         fidpairs.extend(_idttools.tile_pauli_fidpairs(sto_tmpl_pairs, nqubits, maxweight))
 
@@ -496,39 +678,63 @@ def fidpairs_to_pauli_fidpairs(fidpairs_list, pauli_basis_dicts, nqubits):
         assert(k[-1] in ('X', 'Y', 'Z') and isinstance(v, tuple)), \
             "Invalid measuse pauli dict format!"
 
-    rev_prepDict = {v: k for k, v in prepDict.items()}
-    rev_measDict = {v: k for k, v in measDict.items()}
+    #Encode each tuple of gate names as an integer (its gate ids as base-`B` digits, ids starting at 1 so
+    # tuples of different lengths get different codes) so that per-qubit lookups don't build & hash tuples.
+    gname_to_id = {gname: i + 1 for i, gname in enumerate(sorted(
+        {gname for v in prepDict.values() for gname in v} | {gname for v in measDict.values() for gname in v}))}
+    B = len(gname_to_id) + 1
+
+    def gatenames_code(gatenames):
+        code = 0
+        for gname in gatenames:
+            code = code * B + gname_to_id[gname]
+        return code
+
+    rev_prepDict = {gatenames_code(v): k for k, v in prepDict.items()}
+    rev_measDict = {gatenames_code(v): k for k, v in measDict.items()}
 
     def convert(opstr, rev_pauli_dict):
-        #Get gatenames_per_qubit (keys = sslbls, vals = lists of gatenames)
+        """ Returns the NQPauliState that `opstr` prepares/measures, or None if it can't be converted """
+        #Get the code of each qubit's sequence of gatenames (list index = sslbl)
         #print("DB: Converting ",opstr)
-        gatenames_per_qubit = _collections.defaultdict(list)
+        codes_per_qubit = [0] * nqubits
         for glbl in opstr:
             for c in glbl.components:  # in case of parallel labels
-                assert(len(c.sslbls) == 1)
-                assert(isinstance(c.sslbls[0], int))
-                gatenames_per_qubit[c.sslbls[0]].append(c.name)
-        #print("DB: gatenames_per_qubit =  ",gatenames_per_qubit)
-        #print("DB: rev keys = ",list(rev_pauli_dict.keys()))
+                if len(c.sslbls) != 1 or not isinstance(c.sslbls[0], int):
+                    return None
+                i = c.sslbls[0]
+                if 0 <= i < nqubits:  # (labels of other qubits are ignored)
+                    gid = gname_to_id.get(c.name, None)
+                    if gid is None: return None  # gate isn't in any known basis prep/meas
+                    codes_per_qubit[i] = codes_per_qubit[i] * B + gid
+        #print("DB: codes_per_qubit =  ",codes_per_qubit)
 
         #Check if list of gatenames equals a known basis prep/meas:
-        letters = ""; signs = []
+        letters = []; signs = []
         for i in range(nqubits):
-            basis = rev_pauli_dict.get(tuple(gatenames_per_qubit[i]), None)
-            #print("DB:  Q%d: %s -> %s" % (i,str(gatenames_per_qubit[i]), str(basis)))
-            assert(basis is not None)  # to indicate convert failed
-            letters += basis[-1]  # last letter of basis should be 'X' 'Y' or 'Z'
+            basis = rev_pauli_dict.get(codes_per_qubit[i], None)
+            #print("DB:  Q%d: %s -> %s" % (i,str(codes_per_qubit[i]), str(basis)))
+            if basis is None: return None  # to indicate convert failed
+            letters.append(basis[-1])  # last letter of basis should be 'X' 'Y' or 'Z'
             signs.append(-1 if (basis[0] == '-') else 1)
 
         #print("DB: SUCCESS: --> ",letters,signs)
-        return _pobjs.NQPauliState(letters, signs)
+        return _pobjs.NQPauliState(''.join(letters), signs)
+
+    #Many fiducial pairs share the same prep or measure fiducial, so cache conversions
+    prep_cache = {}; meas_cache = {}
+
+    def cached_convert(opstr, rev_pauli_dict, cache):
+        key = tuple(opstr)
+        if key not in cache:
+            cache[key] = convert(opstr, rev_pauli_dict)
+        return cache[key]
 
     ret = []
     for prepStr, measStr in fidpairs_list:
-        try:
-            prepPauli = convert(prepStr, rev_prepDict)
-            measPauli = convert(measStr, rev_measDict)
-        except AssertionError:
+        prepPauli = cached_convert(prepStr, rev_prepDict, prep_cache)
+        measPauli = cached_convert(measStr, rev_measDict, meas_cache)
+        if prepPauli is None or measPauli is None:
             continue  # skip strings we can't convert
         ret.append((prepPauli, measPauli))
 
@@ -731,10 +937,11 @@ def make_idle_tomography_list(nqubits, max_lengths, pauli_basis_dicts, maxweight
     fidpairs = [(x.to_circuit(prepDict), y.to_circuit(measDict))
                 for x, y in pauli_fidpairs]  # e.g. convert ("XY","ZX") to tuple of Circuits
 
+    idle_powers = [GiStr * L for L in max_lengths]  # built once, shared by all fidpairs
     listOfExperiments = []
     for prepFid, measFid in fidpairs:  # list of fidpairs / configs (a prep/meas that gets I^L placed btwn it)
-        for L in max_lengths:
-            listOfExperiments.append(prepFid + GiStr * L + measFid)
+        for idle_power in idle_powers:
+            listOfExperiments.append(prepFid + idle_power + measFid)
 
     return listOfExperiments
 
@@ -819,8 +1026,9 @@ def make_idle_tomography_lists(nqubits, max_lengths, pauli_basis_dicts, maxweigh
     listOfListsOfExperiments = []
     for L in max_lengths:
         expsForThisL = []
+        idle_power = GiStr * L
         for prepFid, measFid in fidpairs:  # list of fidpairs / configs (a prep/meas that gets I^L placed btwn it)
-            expsForThisL.append(prepFid + GiStr * L + measFid)
+            expsForThisL.append(prepFid + idle_power + measFid)
         listOfListsOfExperiments.append(expsForThisL)
 
     return listOfListsOfExperiments
@@ -872,50 +1080,165 @@ def compute_observed_samebasis_err_rate(dataset, pauli_fidpair, pauli_basis_dict
         error rate and the data points that were fit.
     """
     # fit number of given outcome counts to a line
+    drows = _fidpair_dataset_rows(dataset, pauli_fidpair, pauli_basis_dicts, [idle_string * L for L in max_lengths])
+    fit_data = _samebasis_fit_data(*_samebasis_counts(dataset, drows, [outcome]))
+    return _fit_observed_err_rates(max_lengths, fit_data, fit_order)[0]
+
+
+def _fidpair_dataset_rows(dataset, pauli_fidpair, pauli_basis_dicts, idle_powers):
+    """
+    Get the data set rows for the `prepFiducial + idle_string^L + measFiducial`
+    sequences of a Pauli fiducial pair, where `idle_powers` is the list of
+    (precomputed) `idle_string^L` circuits, one for each `L` in `max_lengths`.
+    """
     pauli_prep, pauli_meas = pauli_fidpair
 
     prepDict, measDict = pauli_basis_dicts
     prepFid = pauli_prep.to_circuit(prepDict)
     measFid = pauli_meas.to_circuit(measDict)
+    return [dataset[prepFid + idle_power + measFid] for idle_power in idle_powers]
+
+
+def _samebasis_counts(dataset, drows, outcomes):
+    """
+    Gets the counts of each of `outcomes` and the total counts in `drows`,
+    the data set rows of a fiducial pair (one per `L`).
 
+    Returns a `(nOutcomes, nL)` array of counts and a length-`nL` array of totals.
+    """
+    nLabels = len(dataset.olIndex)
+    cnts = _np.zeros((len(drows), nLabels + 1), 'd')  # extra column of zeros for outcomes not in `dataset`
+    for k, drow in enumerate(drows):
+        cnts[k, 0:nLabels] = _np.bincount(drow.oli, weights=drow.reps, minlength=nLabels)
+    # NOTE: outcomes are actually 1-tuples
+    return cnts[:, [dataset.olIndex.get((outcome.rep,), nLabels) for outcome in outcomes]].T, cnts.sum(axis=1)
+
+
+def _samebasis_fit_data(counts, totals):
+    """
+    Gets the data to fit, the fit weights and the error bars for each row of
+    `counts`, as returned (along with `totals`) by :function:`_samebasis_counts`.
+    This is separate from :function:`compute_observed_samebasis_err_rate` so
+    that all the outcomes of a fiducial pair can be processed together.
+
+    Returns a list of `(data_to_fit, weights, errbars)` tuples, one per outcome.
+    """
     #Note on weights:
     # data point with frequency f and N samples should be weighted w/ sqrt(N)/sqrt(f*(1-f))
     # but in case f is 0 or 1 we use proxy f' by adding a dummy 0 and 1 count.
-    def freq_and_weight(circuit, outcome):
-        """Get the frequency, weight, and errobar for a ptic circuit"""
-        cnts = dataset[circuit].counts  # a normal dict
-        total = sum(cnts.values())
-        f = cnts.get((outcome.rep,), 0) / total  # (py3 division) NOTE: outcomes are actually 1-tuples
-        fp = (cnts.get((outcome.rep,), 0) + 1) / (total + 2)  # Note: can't == 1
-        wt = _np.sqrt(total / abs(fp * (1.0 - fp)))  # abs to deal with non-CP data (simulated using termorder:1)
-        err = _np.sqrt(abs(f * (1.0 - f)) / total)  # no need to use fp
-        return f, wt, err
+    f = counts / totals
+    fp = (counts + 1) / (totals + 2)  # Note: can't == 1
+    wts = _np.sqrt(totals / abs(fp * (1.0 - fp)))  # abs to deal with non-CP data (simulated using termorder:1)
+    errbars = _np.sqrt(abs(f * (1.0 - f)) / totals)  # no need to use fp
+    return list(zip(f.tolist(), wts.tolist(), errbars.tolist()))
 
-    #Get data to fit and weights to use in fitting
-    data_to_fit = []; wts = []; errbars = []
-    for L in max_lengths:
-        opstr = prepFid + idle_string * L + measFid
-        f, wt, err = freq_and_weight(opstr, outcome)
-        data_to_fit.append(f)
-        wts.append(wt)
-        errbars.append(err)
+
+def _samebasis_fidpair_infos(pauli_fidpair, outcomes, counts, totals, max_lengths,
+                             fit_order, err_xbits, err_zbits, err_indices, include_affine):
+    """
+    Fits the observed error rates and computes the jacobian rows of several outcomes of a same-basis fidpair.
+
+    All the `outcomes` are fit and have their jacobian rows computed together.
+    Arguments are plain arrays & Pauli objects (rather than a data set) so that
+    this function can be cheaply run in a separate process.
+
+    Parameters
+    ----------
+    pauli_fidpair, max_lengths, fit_order
+        See :function:`compute_observed_samebasis_err_rate`.
+
+    outcomes : list
+        A list of :class:`NQOutcome` objects.
+
+    counts, totals : numpy.ndarray
+        The counts of each outcome and total counts for each `L`, as returned by
+        :function:`_samebasis_counts`.
+
+    err_xbits, err_zbits, err_indices, include_affine
+        Encodings of the errors, see :function:`_jac_rows`.
+
+    Returns
+    -------
+    OrderedDict
+        A dictionary of fit information, keyed by outcome, as returned by
+        :function:`compute_observed_samebasis_err_rate` but with an additional
+        `"jacobian row"` key.
+    """
+    jac_rows = _jac_rows(pauli_fidpair[0], pauli_fidpair[1], outcomes,
+                         err_xbits, err_zbits, err_indices, include_affine)
+    infos = _fit_observed_err_rates(max_lengths, _samebasis_fit_data(counts, totals), fit_order)
+
+    ret = _collections.OrderedDict()
+    for out, Jrow, info in zip(outcomes, jac_rows, infos):
+        info['jacobian row'] = Jrow
+        ret[out] = info
+    return ret
+
+
+def _fit_observed_err_rates(max_lengths, fit_data, fit_order):
+    """
+    Fits several data series to polynomials in `L` and extracts their observed rates.
+
+    The weighted least-squares problems are equivalent to calling `numpy.polyfit`
+    on each series, but are solved together: since the series share the same
+    (Vandermonde) design matrix, up to weights, their tiny normal equations are
+    formed and solved as one stack.
+
+    Parameters
+    ----------
+    max_lengths : list
+        The germ-power lengths, i.e. the x-values of each data series.
+
+    fit_data : list
+        A list of `(data_to_fit, weights, errbars)` tuples, one per series,
+        each element of which is a list with one entry per `max_lengths` value.
+
+    fit_order : int
+        The polynomial order used to fit the observed data.
+
+    Returns
+    -------
+    list
+        A list of dictionaries of information about each fit, including the
+        observed error rate and the data points that were fit.
+    """
+    if fit_order not in (1, 2): raise NotImplementedError("Only fit_order <= 2 are supported!")
+    if len(fit_data) == 0: return []
+
+    data_to_fit = _np.array([d for d, _, _ in fit_data], 'd')
+    wts = _np.array([w for _, w, _ in fit_data], 'd')
+
+    #weighted curvefit of all series at once, scaling columns as numpy.polyfit does
+    vander = _np.vander(_np.array(max_lengths, 'd'), fit_order + 1)
+    lhs = wts[:, :, None] * vander[None, :, :]
+    rhs = wts * data_to_fit
+    scale = _np.sqrt((lhs * lhs).sum(axis=1))
+    lhs /= scale[:, None, :]
+    if len(set(max_lengths)) > fit_order:  # full column rank, so the (well-scaled) normal equations are safe
+        gram = _np.einsum('sik,sil->skl', lhs, lhs)
+        coeffs = _np.linalg.solve(gram, _np.einsum('sik,si->sk', lhs, rhs)[:, :, None])[:, :, 0] / scale
+    else:  # under-determined fits: use the minimum-norm solution, as numpy.polyfit does
+        rcond = len(max_lengths) * _np.finfo(float).eps
+        coeffs = _np.einsum('sij,sj->si', _np.linalg.pinv(lhs, rcond), rhs) / scale
 
     #curvefit -> slope
-    coeffs = _np.polyfit(max_lengths, data_to_fit, fit_order, w=wts)  # when fit_order = 1 = line
-    if fit_order == 1:
-        slope = coeffs[0]
-    elif fit_order == 2:
+    if fit_order == 1:  # when fit_order = 1 = line
+        slopes = coeffs[:, 0]
+    else:  # fit_order == 2
         #OLD: slope =  coeffs[1] # c2*x2 + c1*x + c0 ->deriv@x=0-> c1
-        det = coeffs[1]**2 - 4 * coeffs[2] * coeffs[0]
-        slope = -_np.sign(coeffs[0]) * _np.sqrt(det) if det >= 0 else coeffs[1]
-    else: raise NotImplementedError("Only fit_order <= 2 are supported!")
+        det = coeffs[:, 1]**2 - 4 * coeffs[:, 2] * coeffs[:, 0]
+        slopes = _np.where(det >= 0, -_np.sign(coeffs[:, 0]) * _np.sqrt(abs(det)), coeffs[:, 1])
+        # c2*x2 + c1*x + c0 ->deriv@y=0-> 2*c2*x0 + c1;
+        # x0=[-c1 +/- sqrt(c1^2 - 4c2*c0)] / 2*c2; take smaller root
+        # but if determinant is < 0, fall back to x=0 slope
 
-    return {'rate': slope,
-            'fit_order': fit_order,
-            'fitCoeffs': coeffs,
-            'data': data_to_fit,
-            'errbars': errbars,
-            'weights': wts}
+    return [{'rate': slope,
+             'fit_order': fit_order,
+             'fitCoeffs': cfs,
+             'data': data,
+             'errbars': errbars,
+             'weights': w}
+            for slope, cfs, (data, w, errbars) in zip(slopes, coeffs, fit_data)]
 
 
 def compute_observed_diffbasis_err_rate(dataset, pauli_fidpair, pauli_basis_dicts,
@@ -961,41 +1284,101 @@ def compute_observed_diffbasis_err_rate(dataset, pauli_fidpair, pauli_basis_dict
         error rate and the data points that were fit.
     """
     # fit expectation value of `observable` (trace over all I elements of it) to a line
-    pauli_prep, pauli_meas = pauli_fidpair
+    drows = _fidpair_dataset_rows(dataset, pauli_fidpair, pauli_basis_dicts, [idle_string * L for L in max_lengths])
+    outcome_bits = _outcome_bit_table(dataset, len(observable))
+    fit_data = _diffbasis_fit_data([_bit_counts(drow, outcome_bits) for drow in drows],
+                                   pauli_fidpair[1], observable)
+    return _fit_observed_err_rates(max_lengths, [fit_data], fit_order)[0]
 
-    prepDict, measDict = pauli_basis_dicts
-    prepFid = pauli_prep.to_circuit(prepDict)
-    measFid = pauli_meas.to_circuit(measDict)
 
+def _outcome_bit_table(dataset, nqubits):
+    """
+    Tabulates the bits of each of `dataset`'s outcome labels.
+
+    Parameters
+    ----------
+    dataset : DataSet
+        The data set, whose outcomes are `nqubits`-bit strings.
+
+    nqubits : int
+        The number of qubits.
+
+    Returns
+    -------
+    numpy.ndarray
+        A `(nOutcomeLabels, nqubits)` array of 0s and 1s, indexed by
+        outcome label index (as used in data set rows' `oli` arrays).
+    """
+    table = _np.zeros((max(dataset.ol.keys(), default=-1) + 1, nqubits), 'd')
+    for i, ol in dataset.ol.items():
+        table[i, :] = [b != '0' for b in ol[0]]  # [0] b/c outcomes are actually 1-tuples
+    return table
+
+
+def _bit_counts(drow, outcome_bits):
+    """
+    Tabulates the single- and two-qubit marginal counts of a data set row.
+
+    Parameters
+    ----------
+    drow : DataSetRow
+        The data set row.
+
+    outcome_bits : numpy.ndarray
+        The bits of the row's data set's outcome labels, as returned by
+        :function:`_outcome_bit_table`.
+
+    Returns
+    -------
+    total : float
+        The total number of counts.
+
+    ones : numpy.ndarray
+        Length-`nqubits` array whose `i`-th element is the number of counts
+        with a "1" in the `i`-th position.
+
+    odd : numpy.ndarray
+        A `(nqubits, nqubits)` array whose `(i,j)` element is the number of
+        counts whose `i`-th and `j`-th bits differ.
+    """
+    # dense per-outcome-label counts, so marginals are just products with `outcome_bits`
+    cnts = _np.bincount(drow.oli, weights=drow.reps, minlength=outcome_bits.shape[0])
+    ones = _np.dot(cnts, outcome_bits)
+    odd = _np.dot(outcome_bits.T * cnts, 1 - outcome_bits)  # counts with i-th bit = 1 and j-th bit = 0
+    odd += odd.T
+    return drow.total, ones, odd
+
+
+def _diffbasis_fit_data(bit_counts, pauli_meas, observable):
+    """
+    Gets the data to fit, the fit weights and the error bars for `observable`
+    from `bit_counts`, a list of per-`L` :function:`_bit_counts` tables.  This
+    is separate from :function:`compute_observed_diffbasis_err_rate` so that
+    counts can be tabulated once and reused for all the observables of a
+    fiducial pair.
+    """
     #observable is always equal to pauli_meas (up to signs) with all but 1 or 2
     # (maxErrWt in general) of it's elements replaced with 'I', essentially just
     # telling us which 1 or 2 qubits to take the <Z> or <ZZ> expectation value of
     # (since the meas fiducial gets us in the right basis) -- i.e. the qubits to *not* trace over.
-    obs_indices = [i for i, letter in enumerate(observable.rep) if letter != 'I']
-    minus_sign = _np.prod([pauli_meas.signs[i] for i in obs_indices])
+    obs_indices = _np.flatnonzero(observable.rep_arr).tolist()  # (packed) Pauli code 0 == 'I'
+    minus_sign = int(_np.prod(pauli_meas.signs_arr[obs_indices]))
 
-    def unsigned_exptn_and_weight(circuit, observed_indices):
+    def unsigned_exptn_and_weight(bitcnts, observed_indices):
         #compute expectation value of observable
-        drow = dataset[circuit]  # dataset row
-        total = drow.total
+        total, ones, odd = bitcnts
 
         # <Z> = 0 count - 1 count (if measFid sign is +1, otherwise reversed via minus_sign)
         if len(observed_indices) == 1:
             i = observed_indices[0]  # the qubit we care about
-            cnt0 = cnt1 = 0
-            for outcome, cnt in drow.counts.items():
-                if outcome[0][i] == '0': cnt0 += cnt  # [0] b/c outcomes are actually 1-tuples
-                else: cnt1 += cnt
+            cnt1 = ones[i]; cnt0 = total - cnt1
             exptn = float(cnt0 - cnt1) / total
             fp = 0.5 + 0.5 * float(cnt0 - cnt1 + 1) / (total + 2)
 
         # <ZZ> = 00 count - 01 count - 10 count + 11 count (* minus_sign)
         elif len(observed_indices) == 2:
             i, j = observed_indices  # the qubits we care about
-            cnt_even = cnt_odd = 0
-            for outcome, cnt in drow.counts.items():
-                if outcome[0][i] == outcome[0][j]: cnt_even += cnt
-                else: cnt_odd += cnt
+            cnt_odd = odd[i, j]; cnt_even = total - cnt_odd
             exptn = float(cnt_even - cnt_odd) / total
             fp = 0.5 + 0.5 * float(cnt_even - cnt_odd + 1) / (total + 2)
         else:
@@ -1008,32 +1391,184 @@ def compute_observed_diffbasis_err_rate(dataset, pauli_fidpair, pauli_basis_dict
 
     #Get data to fit and weights to use in fitting
     data_to_fit = []; wts = []; errbars = []
-    for L in max_lengths:
-        opstr = prepFid + idle_string * L + measFid
-        exptn, wt, err = unsigned_exptn_and_weight(opstr, obs_indices)
+    for bitcnts in bit_counts:
+        exptn, wt, err = unsigned_exptn_and_weight(bitcnts, obs_indices)
         data_to_fit.append(minus_sign * exptn)
         wts.append(wt)
         errbars.append(err)
+    return data_to_fit, wts, errbars
 
-    #curvefit -> slope
-    coeffs = _np.polyfit(max_lengths, data_to_fit, fit_order, w=wts)  # when fit_order = 1 = line
-    if fit_order == 1:
-        slope = coeffs[0]
-    elif fit_order == 2:
-        #OLD: slope =  coeffs[1] # c2*x2 + c1*x + c0 ->deriv@x=0-> c1
-        det = coeffs[1]**2 - 4 * coeffs[2] * coeffs[0]
-        slope = -_np.sign(coeffs[0]) * _np.sqrt(det) if det >= 0 else coeffs[1]
-        # c2*x2 + c1*x + c0 ->deriv@y=0-> 2*c2*x0 + c1;
-        # x0=[-c1 +/- sqrt(c1^2 - 4c2*c0)] / 2*c2; take smaller root
-        # but if determinant is < 0, fall back to x=0 slope
-    else: raise NotImplementedError("Only fit_order <= 2 are supported!")
 
-    return {'rate': slope,
-            'fit_order': fit_order,
-            'fitCoeffs': coeffs,
-            'data': data_to_fit,
-            'errbars': errbars,
-            'weights': wts}
+def _solve_jacobian(jac, obs_err_rates, fast=False, printer=None, jac_name=""):
+    """
+    Finds the (minimum-norm, least-squares) intrinsic rates `x` solving
+    `jac * x = obs_err_rates` without forming the pseudo-inverse of `jac`.
+    The rank comes from the same (divide-and-conquer SVD) factorization used
+    for the solve, using `numpy.linalg.matrix_rank`'s default tolerance.
+
+    When `fast` is True the normal equations are solved instead, by
+    pseudo-inverting the (much smaller, symmetric) `jac^T * jac`.  This is
+    faster for tall jacobians but squares their condition number.
+
+    If a `printer` with verbosity >= 2 is given, the rank and the norm of the
+    fit residual `jac * x - obs_err_rates` are logged as diagnostics,
+    labelled by `jac_name`.
+
+    Returns
+    -------
+    x : numpy.ndarray
+    rank : int
+        The rank of `jac`, so callers needn't compute it separately.
+    """
+    jac = _np.asarray(jac, 'd')  # e.g. the stochastic jacobian is int8, which J^T * J would overflow
+    if fast:
+        inv_jtj, rank = _spl.pinvh(_np.dot(jac.T, jac), return_rank=True, check_finite=False)
+        x = _np.dot(inv_jtj, _np.dot(jac.T, obs_err_rates))
+    else:
+        cond = _np.finfo(jac.dtype).eps * max(jac.shape)  # relative singular-value cutoff (as matrix_rank)
+        x, _, rank, _ = _spl.lstsq(jac, obs_err_rates, cond=cond, check_finite=False, lapack_driver='gelsd')
+
+    if printer is not None and printer.verbosity >= 2:  # only pay for the residual when it's logged
+        #(lstsq only returns residuals for full-rank, overdetermined systems, so compute them directly)
+        printer.log("%s-jacobian solve: rank %d of %d, residual norm %g" %
+                    (jac_name, rank, jac.shape[1], _np.linalg.norm(_np.dot(jac, x) - obs_err_rates)), 2)
+    return x, rank
+
+
+def _attach_jacobian_rows(infos_by_fidpair, key, jac, dtype):
+    """
+    Sets `info[key]` of each of the fit-info dicts in `infos_by_fidpair` (a list
+    of per-fidpair dicts, in jacobian-row order) to the corresponding row of
+    `jac`.  This lets processors send just the fit information and the jacobian
+    as one array, rather than a row per info.  The rows are copied (so they
+    don't share the solve's buffer) as `dtype` arrays, since the compact dtype
+    of `jac` (e.g. int8) is an internal detail that shouldn't leak into results.
+    """
+    rows = _np.array(jac, dtype)
+    all_infos = [info for fidpair_infos in infos_by_fidpair for info in fidpair_infos.values()]
+    assert(len(all_infos) == rows.shape[0])
+    for info, row in zip(all_infos, rows):
+        info[key] = row
+
+
+def _warn_rank_deficient(jac_name, rank, num_rates):
+    """ Warns that the `jac_name` jacobian's `rank` (from :function:`_solve_jacobian`) is < `num_rates` """
+    _warnings.warn("Idle tomography: %s-jacobian rank (%d) < #intrinsic rates (%d)" % (jac_name, rank, num_rates))
+
+
+class _RowBlockGatherer(object):
+    """
+    Gathers each processor's 2D float arrays onto the root processor using
+    non-blocking `Igatherv` calls, while the arrays are still being filled.
+
+    The arrays are filled one "unit" of `unit_rows` rows at a time (e.g. one
+    fiducial pair's jacobian rows), and each unit is marked as filled via
+    :method:`post`.  Consecutive units are grouped into blocks of at most
+    `max_block_bytes` bytes (summed over all the arrays), and a block's
+    gathers are posted as soon as all its units are filled so that
+    communication overlaps with the remaining computation.  At most
+    `max_pending_blocks` blocks are left in flight: posting another one first
+    waits for the oldest.  :method:`finish` waits for all of the gathers and
+    returns the gathered arrays (ordered by processor, as `comm.gather` would)
+    on the root processor and `None` elsewhere.  When `comm` is None the local
+    arrays are returned as-is.
+
+    Parameters
+    ----------
+    my_arrays : list
+        This processor's arrays, each with `unit_rows * num_my_units` rows
+        and the same number of columns on all processors.
+
+    unit_rows : int
+        The number of rows in each unit.
+
+    num_my_units : int
+        The number of units held by this processor (can differ between processors).
+
+    comm : mpi4py.MPI.Comm
+        The communicator to gather over, or None.
+
+    max_block_bytes : int, optional
+        The (approximate) maximum size of a block.  A block always holds at
+        least one unit.
+
+    max_pending_blocks : int, optional
+        The maximum number of blocks whose gathers may be in flight at once.
+    """
+
+    def __init__(self, my_arrays, unit_rows, num_my_units, comm, max_block_bytes=4 * 1024**2,
+                 max_pending_blocks=8):
+        assert(all([a.flags['C_CONTIGUOUS'] and a.dtype == _np.float64 for a in my_arrays])), \
+            "Arrays must be contiguous float64 buffers, as they're sent while being filled"
+        self.my_arrays = my_arrays
+        self.unit_rows = unit_rows
+        self.num_my_units = num_my_units
+        self.comm = comm
+        self.next_unit = 0
+        if comm is None: return
+
+        from mpi4py import MPI
+        self.MPI = MPI
+        unit_bytes = max(unit_rows * sum([a.shape[1] for a in my_arrays]) * 8, 1)  # the same on all processors
+        self.units_per_block = max(max_block_bytes // unit_bytes, 1)
+        self.max_pending_blocks = max_pending_blocks
+        self.pending = _collections.deque()  # the request lists of the blocks in flight, oldest first
+        self.next_block = 0
+        num_my_blocks = -(-num_my_units // self.units_per_block)
+        self.num_blocks = comm.allreduce(num_my_blocks, op=MPI.MAX)  # number of Igatherv calls per array
+        units_per_rank = comm.gather(num_my_units, root=0)
+        if comm.Get_rank() == 0:
+            self.units_per_rank = _np.array(units_per_rank, _np.int64)
+            self.unit_offsets = _np.concatenate(([0], _np.cumsum(self.units_per_rank)))
+            self.gathered = [_np.empty((self.unit_offsets[-1] * unit_rows, a.shape[1]), 'd')
+                             for a in self.my_arrays]
+
+    def post(self, i):
+        """
+        Marks unit `i` (of this processor) as filled, posting the gathers of
+        its block if this completes the block.  Units must be posted in order.
+        """
+        assert(i == self.next_unit); self.next_unit += 1
+        if self.comm is None: return
+        if self.next_unit % self.units_per_block == 0 or self.next_unit == self.num_my_units:
+            self._post_block()
+
+    def _post_block(self):
+        """ Posts the gathers of the next block, waiting for the oldest block first if too many are in flight """
+        if len(self.pending) >= self.max_pending_blocks:
+            self.MPI.Request.Waitall(self.pending.popleft())
+        MPI = self.MPI; k = self.next_block; self.next_block += 1
+        start = min(k * self.units_per_block, self.num_my_units) * self.unit_rows
+        stop = min((k + 1) * self.units_per_block, self.num_my_units) * self.unit_rows
+        if self.comm.Get_rank() == 0:
+            units_in_block = _np.clip(self.units_per_rank - k * self.units_per_block, 0, self.units_per_block)
+            first_unit = self.unit_offsets[:-1] + k * self.units_per_block
+
+        requests = []
+        for iarray, a in enumerate(self.my_arrays):
+            ncols = a.shape[1]
+            if self.comm.Get_rank() == 0:
+                sizes = units_in_block * self.unit_rows * ncols
+                displacements = _np.where(units_in_block > 0, first_unit * self.unit_rows * ncols, 0)
+                recvbuf = [self.gathered[iarray], sizes, displacements, MPI.DOUBLE]
+            else:
+                recvbuf = [None, None, None, MPI.DOUBLE]
+            requests.append(self.comm.Igatherv(a[start:stop], recvbuf, root=0))
+        self.pending.append(requests)
+
+    def finish(self):
+        """
+        Posts any remaining (empty, on this processor) blocks, waits for all
+        the gathers to complete, and returns the list of gathered arrays on
+        the root processor (`None` on other processors).
+        """
+        if self.comm is None: return self.my_arrays
+        assert(self.next_unit == self.num_my_units), "All units must be posted before finishing!"
+        while self.next_block < self.num_blocks:
+            self._post_block()
+        while self.pending:
+            self.MPI.Request.Waitall(self.pending.popleft())
+        return self.gathered if self.comm.Get_rank() == 0 else None
 
 
 def do_idle_tomography(nqubits, dataset, max_lengths, pauli_basis_dicts, maxweight=2,
@@ -1089,6 +1624,17 @@ def do_idle_tomography(nqubits, dataset, max_lengths, pauli_basis_dicts, maxweig
         - "pauli_fidpairs": alternate list of pauli fiducial pairs to use
         - "fit order" : integer order for polynomial fits to data
         - "ham_tmpl" : see :function:`make_idle_tomography_list`
+        - "num_processes" : number of (Python multiprocessing) processes used
+          to analyze the stochastic/affine fiducial pairs when `comm` is None
+        - "num_threads" : number of threads used to compute the Hamiltonian
+          (and affine-observable) jacobian blocks of different fiducial pairs
+          concurrently.  Each fiducial pair's observables are fit, and its
+          rows posted to any MPI gather, as soon as its blocks are ready.
+          Worthwhile when numba is installed, as its kernels release the GIL.
+          Defaults to 1.
+        - "fast solve" : if True, solve for the intrinsic rates using the normal
+          equations of each jacobian (faster, but less accurate when the
+          jacobian is poorly conditioned).  Defaults to False.
 
     verbosity : int, optional
         How much detail to send to stdout.
@@ -1117,8 +1663,12 @@ def do_idle_tomography(nqubits, dataset, max_lengths, pauli_basis_dicts, maxweig
         GiStr = _Circuit(idle_string, line_labels=line_labels)
     else:
         GiStr = _Circuit(idle_string, num_lines=nqubits)
+    idle_powers = [GiStr * L for L in max_lengths]  # built once, shared by all fidpairs
 
     jacmode = advanced_options.get("jacobian mode", "separate")
+    num_processes = advanced_options.get("num_processes", 1) if (comm is None) else 1
+    fast_solve = advanced_options.get("fast solve", False)
+    num_threads = advanced_options.get("num_threads", 1)
     sto_aff_jac = None; sto_aff_obs_err_rates = None
     ham_aff_jac = None; ham_aff_obs_err_rates = None
 
@@ -1146,6 +1696,8 @@ def do_idle_tomography(nqubits, dataset, max_lengths, pauli_basis_dicts, maxweig
         diff_basis_fidpairs = None  # safety
 
     errors = _idttools.allerrors(nqubits, maxweight)
+    err_indices = _np.array([err.rep_arr for err in errors])
+    err_xbits, err_zbits = _symplectic_bitmasks(err_indices)
     fit_order = advanced_options.get('fit order', 1)
     intrinsic_rates = {}
     pauli_fidpair_dict = {}
@@ -1162,77 +1714,84 @@ def do_idle_tomography(nqubits, dataset, max_lengths, pauli_basis_dicts, maxweig
                 preferred_prep_basis_signs, preferred_meas_basis_signs)
         #print("DB: %d same-basis pairs" % len(pauli_fidpairs))
 
-        #divide up strings among ranks
-        indxFidpairList = list(enumerate(pauli_fidpairs))
-        my_FidpairList, _, _ = _tools.mpitools.distribute_indices(indxFidpairList, comm, False)
-
-        my_J = []; my_obs_infos = []
-        for i, (ifp, pauli_fidpair) in enumerate(my_FidpairList):
-            #NOTE: pauli_fidpair is a 2-tuple of NQPauliState objects
-
-            all_outcomes = _idttools.alloutcomes(pauli_fidpair[0], pauli_fidpair[1], maxweight)
-            t0 = _time.time(); infos_for_this_fidpair = _collections.OrderedDict()
-            for j, out in enumerate(all_outcomes):
-
-                printer.log("  - outcome %d of %d" % (j, len(all_outcomes)), 2)
-
-                #form jacobian rows as we get extrinsic error rates
-                Jrow = [stochastic_jac_element(pauli_fidpair[0], err, pauli_fidpair[1], out)
-                        for err in errors]
-                if include_affine:
-                    Jrow.extend([affine_jac_element(pauli_fidpair[0], err, pauli_fidpair[1], out)
-                                 for err in errors])
-                my_J.append(Jrow)
-
-                info = compute_observed_samebasis_err_rate(dataset, pauli_fidpair, pauli_basis_dicts, GiStr,
-                                                           out, max_lengths, fit_order)
-                info['jacobian row'] = _np.array(Jrow)
-                infos_for_this_fidpair[out] = info
-
-            my_obs_infos.append(infos_for_this_fidpair)
-            printer.log("%sStochastic fidpair %d of %d: %d outcomes analyzed [%.1fs]" %
-                        (rankStr, i, len(my_FidpairList), len(all_outcomes), _time.time() - t0), 1)
+        #divide up (fidpair, outcome) pairs among ranks, as the number of outcomes varies between fidpairs
+        all_outcomes_per_fp = [_idttools.alloutcomes(fp[0], fp[1], maxweight) for fp in pauli_fidpairs]
+        work_items = [(ifp, j) for ifp, outs in enumerate(all_outcomes_per_fp) for j in range(len(outs))]
+        my_work_items, _, _ = _tools.mpitools.distribute_indices(work_items, comm, False)
+        my_fidpair_work = [(ifp, [j for _, j in items])
+                           for ifp, items in _itertools.groupby(my_work_items, key=lambda item: item[0])]
+
+        #Fidpairs are processed by `num_processes` worker processes, which are just sent each fidpair's counts
+        #NOTE: pauli_fidpair is a 2-tuple of NQPauliState objects
+        t0 = _time.time(); args_list = []
+        for ifp, my_js in my_fidpair_work:
+            my_outcomes = [all_outcomes_per_fp[ifp][j] for j in my_js]
+            drows = _fidpair_dataset_rows(dataset, pauli_fidpairs[ifp], pauli_basis_dicts, idle_powers)
+            counts, totals = _samebasis_counts(dataset, drows, my_outcomes)
+            args_list.append((pauli_fidpairs[ifp], my_outcomes, counts, totals, max_lengths, fit_order,
+                              err_xbits, err_zbits, err_indices, include_affine))
+        results = _tools.mptools.starmap_with_kwargs(_samebasis_fidpair_infos, len(args_list), num_processes,
+                                                     args_list, [{}] * len(args_list))
+
+        my_J = _np.empty((len(my_work_items), len(errors) * (2 if include_affine else 1)), _np.int8)
+        my_rates = _np.empty(len(my_work_items), 'd')
+        my_obs_infos = []; k = 0
+        for (ifp, _), infos_for_this_fidpair in zip(my_fidpair_work, results):
+            n = len(infos_for_this_fidpair)
+            my_J[k:k + n, :] = [info.pop('jacobian row') for info in infos_for_this_fidpair.values()]  # re-added below
+            my_rates[k:k + n] = [info['rate'] for info in infos_for_this_fidpair.values()]; k += n
+            my_obs_infos.append((ifp, infos_for_this_fidpair))
+        assert(k == my_J.shape[0])
+        #Stochastic rows are one-hot in their error columns (and affine ones are mostly zero), so send them sparsely
+        if comm is not None and comm.Get_size() > 1:
+            my_J = _sps.csr_matrix(my_J)
+        printer.log("%sStochastic: %d outcomes of %d fidpairs analyzed [%.1fs]" %
+                    (rankStr, len(my_work_items), len(my_fidpair_work), _time.time() - t0), 1)
 
         #Gather results
         info_list = [my_obs_infos] if (comm is None) else comm.gather(my_obs_infos, root=0)
         J_list = [my_J] if (comm is None) else comm.gather(my_J, root=0)
+        rates_list = [my_rates] if (comm is None) else comm.gather(my_rates, root=0)
 
         if comm is None or comm.Get_rank() == 0:
             # pseudo-invert J to get "intrinsic" error rates (labeled by AllErrors(nqubits))
             # J*intr = obs
-            J = _np.concatenate(J_list, axis=0)
-            infos_by_fidpair = list(_itertools.chain(*info_list))  # flatten ~ concatenate
-
-            obs_err_rates = _np.array([info['rate']
-                                       for fidpair_infos in infos_by_fidpair
-                                       for info in fidpair_infos.values()])
+            if len(J_list) == 1:  # a single processor: its (dense) rows are already the final J & rates
+                J, obs_err_rates = J_list[0], rates_list[0]
+            else:  # densify (for the solve) each rank's rows straight into the final J & rates buffers
+                J = _np.empty((sum([Jpart.shape[0] for Jpart in J_list]), my_J.shape[1]), _np.int8)
+                obs_err_rates = _np.empty(J.shape[0], 'd'); off = 0
+                for Jpart, rates_part in zip(J_list, rates_list):  # ranks hold consecutive outcomes, so they line up
+                    Jpart.toarray(out=J[off:off + Jpart.shape[0]])
+                    obs_err_rates[off:off + Jpart.shape[0]] = rates_part; off += Jpart.shape[0]
+
+            #A fidpair's outcomes may be split between ranks, so merge its infos (in rank order)
+            infos_by_fidpair = [_collections.OrderedDict() for pauli_fidpair in pauli_fidpairs]
+            for ifp, fidpair_infos in _itertools.chain(*info_list):
+                infos_by_fidpair[ifp].update(fidpair_infos)
+            _attach_jacobian_rows(infos_by_fidpair, 'jacobian row', J, _np.int64)
 
             if jacmode == "separate":
-                rank = _np.linalg.matrix_rank(J)
+                intrinsic_stochastic_rates, rank = _solve_jacobian(J, obs_err_rates, fast_solve, printer, "samebasis")
                 if rank < J.shape[1]:
                     #Rank defficiency - if affine is "auto", try with just stochastic
                     if include_affine == "auto":
                         J_sto = J[:, 0:len(errors)]
-                        rank_sto = _np.linalg.matrix_rank(J_sto)
+                        rates_sto, rank_sto = _solve_jacobian(J_sto, obs_err_rates, fast_solve, printer, "stochastic")
                         if rank_sto < len(errors):
                             if include_stochastic == "auto":
                                 include_stochastic = False  # drop stochastic part
                             else:
-                                _warnings.warn(("Idle tomography: stochastic-jacobian rank "
-                                                "(%d) < #intrinsic rates (%d)") % (rank_sto, J_sto.shape[1]))
+                                _warn_rank_deficient("stochastic", rank_sto, J_sto.shape[1])
                         else:  # stochasic alone is OK - drop affine part
-                            J = J_sto
+                            J = J_sto; intrinsic_stochastic_rates = rates_sto
                             include_affine = False  # for below processing
 
                     else:
                         if include_affine and include_stochastic == "auto":
                             raise ValueError(("Cannot set `include_stochastic`"
                                               " to 'auto' when `include_affine` is True"))
-                        _warnings.warn(("Idle tomography: %s-jacobian rank "
-                                        "(%d) < #intrinsic rates (%d)") % ("samebasis", rank, J.shape[1]))
-
-                invJ = _np.linalg.pinv(J)
-                intrinsic_stochastic_rates = _np.dot(invJ, obs_err_rates)
+                        _warn_rank_deficient("samebasis", rank, J.shape[1])
 
             if include_stochastic:  # "auto" could change to False in jac processing above
                 if include_affine:
@@ -1275,75 +1834,98 @@ def do_idle_tomography(nqubits, dataset, max_lengths, pauli_basis_dicts, maxweig
         indxFidpairList = list(enumerate(pauli_fidpairs))
         my_FidpairList, _, _ = _tools.mpitools.distribute_indices(indxFidpairList, comm, False)
 
-        my_J = []; my_obs_infos = []; my_Jaff = []
-        for i, (ifp, pauli_fidpair) in enumerate(my_FidpairList):
+        outcome_bits = _outcome_bit_table(dataset, nqubits)
+        #the number of observables is the same for every fidpair, so the jacobian blocks can be preallocated
+        n_obs = len(_idttools.allobservables(pauli_fidpairs[0][1], maxweight)) if len(pauli_fidpairs) > 0 else 0
+        my_J = _np.empty((len(my_FidpairList) * n_obs, len(errors)), 'd')
+        my_Jaff = _np.empty((len(my_FidpairList) * n_obs, len(errors)), 'd') if include_affine else None
+        my_rates = _np.empty((len(my_FidpairList) * n_obs, 1), 'd')  # a column, so it's gathered like the J's
+        my_obs_infos = []
+        #fidpairs' jacobian & rates rows are sent to the root (in blocks) once filled, while the next are computed
+        J_gatherer = _RowBlockGatherer([my_J, my_rates] + ([my_Jaff] if include_affine else []),
+                                       n_obs, len(my_FidpairList), comm)
+
+        def fill_jac_blocks(i, pauli_fidpair):
+            """ Forms the jacobian rows of all the observables of the `i`-th fidpair at once """
             all_observables = _idttools.allobservables(pauli_fidpair[1], maxweight)
+            assert(len(all_observables) == n_obs)
+            my_J[i * n_obs:(i + 1) * n_obs, :] = _hamiltonian_jac_rows(pauli_fidpair[0], all_observables, err_indices)
+            if include_affine:
+                my_Jaff[i * n_obs:(i + 1) * n_obs, :] = _affine_obs_jac_rows(pauli_fidpair[0], all_observables,
+                                                                             err_indices)
 
+        def fit_and_post(i, pauli_fidpair):
+            """ Fits the observables of the `i`-th fidpair, whose jacobian blocks are filled, and posts its rows """
+            all_observables = _idttools.allobservables(pauli_fidpair[1], maxweight)
             t0 = _time.time(); infos_for_this_fidpair = _collections.OrderedDict()
-            for j, obs in enumerate(all_observables):
+            bit_counts = [_bit_counts(drow, outcome_bits) for drow in _fidpair_dataset_rows(
+                dataset, pauli_fidpair, pauli_basis_dicts, idle_powers)]
+
+            # J_ham * Hintrinsic + J_aff * Aintrinsic = observed_rates, and Aintrinsic is known
+            #  -> need to find J_aff, the jacobian of *observable expectation vales* w/affine params.
+            #Note: the jacobian rows are added to the infos on the root processor, after they're gathered
+            infos = _fit_observed_err_rates(max_lengths, [_diffbasis_fit_data(bit_counts, pauli_fidpair[1], obs)
+                                                          for obs in all_observables], fit_order)
+            for j, (obs, info) in enumerate(zip(all_observables, infos)):
                 printer.log("  - observable %d of %d" % (j, len(all_observables)), 2)
-
-                #form jacobian rows as we get extrinsic error rates
-                Jrow = [hamiltonian_jac_element(pauli_fidpair[0], err, obs) for err in errors]
-                my_J.append(Jrow)
-
-                # J_ham * Hintrinsic + J_aff * Aintrinsic = observed_rates, and Aintrinsic is known
-                #  -> need to find J_aff, the jacobian of *observable expectation vales* w/affine params.
-                if include_affine:
-                    Jaff_row = [affine_jac_obs_element(pauli_fidpair[0], err, obs)
-                                for err in errors]
-                    my_Jaff.append(Jaff_row)
-
-                info = compute_observed_diffbasis_err_rate(dataset, pauli_fidpair, pauli_basis_dicts, GiStr, obs,
-                                                           max_lengths, fit_order)
-                info['jacobian row'] = _np.array(Jrow)
-                if include_affine: info['affine jacobian row'] = _np.array(Jaff_row)
                 infos_for_this_fidpair[obs] = info
+            my_rates[i * n_obs:(i + 1) * n_obs, 0] = [info['rate'] for info in infos]
+            J_gatherer.post(i)
 
             my_obs_infos.append(infos_for_this_fidpair)
             printer.log("%sHamiltonian fidpair %d of %d: %d observables analyzed [%.1fs]" %
                         (rankStr, i, len(my_FidpairList), len(all_observables), _time.time() - t0), 1)
 
-        #Gather results
+        if num_threads > 1:
+            #each thread writes to its own fidpairs' (disjoint) rows of my_J & my_Jaff.  Fidpairs are fit & posted
+            # in order as their blocks complete, so the fits and gathers overlap the remaining threaded work.
+            with _futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+                jac_futures = [executor.submit(fill_jac_blocks, i, fp) for i, (_, fp) in enumerate(my_FidpairList)]
+                try:
+                    for i, (ifp, pauli_fidpair) in enumerate(my_FidpairList):
+                        jac_futures[i].result()  # wait for this fidpair's blocks (re-raises any exception)
+                        fit_and_post(i, pauli_fidpair)
+                except BaseException:
+                    for future in jac_futures: future.cancel()  # don't start queued blocks; exiting waits for the rest
+                    raise
+        else:
+            for i, (ifp, pauli_fidpair) in enumerate(my_FidpairList):
+                fill_jac_blocks(i, pauli_fidpair)
+                fit_and_post(i, pauli_fidpair)
+
+        #Gather results (finish the non-blocking gathers first, so all ranks issue collectives in the same order)
+        gathered_Js = J_gatherer.finish()
+        if gathered_Js is not None:
+            J = gathered_Js[0]; obs_err_rates = gathered_Js[1][:, 0]
+            if include_affine: Jaff = gathered_Js[2]
         info_list = [my_obs_infos] if (comm is None) else comm.gather(my_obs_infos, root=0)
-        J_list = [my_J] if (comm is None) else comm.gather(my_J, root=0)
-        if include_affine:
-            Jaff_list = [my_Jaff] if (comm is None) else comm.gather(my_Jaff, root=0)
 
         if comm is None or comm.Get_rank() == 0:
             # pseudo-invert J to get "intrinsic" error rates (labeled by AllErrors(nqubits))
             # J*intr = obs
-            J = _np.concatenate(J_list, axis=0)
             infos_by_fidpair = list(_itertools.chain(*info_list))  # flatten ~ concatenate
-
-            obs_err_rates = _np.array([info['rate']
-                                       for fidpair_infos in infos_by_fidpair
-                                       for info in fidpair_infos.values()])
+            _attach_jacobian_rows(infos_by_fidpair, 'jacobian row', J, 'd')
+            if include_affine: _attach_jacobian_rows(infos_by_fidpair, 'affine jacobian row', Jaff, _np.int64)
 
             if jacmode == "separate":
                 if include_affine:
                     #'correct' observed rates due to known affine errors, i.e.:
                     # J_ham * Hintrinsic = observed_rates - J_aff * Aintrinsic
-                    Jaff = _np.concatenate(Jaff_list, axis=0)
-                    Aintrinsic = intrinsic_rates['affine']
-                    corr = _np.dot(Jaff, Aintrinsic)
-                    obs_err_rates -= corr
+                    # (Jaff is the C-contiguous Gatherv buffer, so this is a single GEMV with no copies)
+                    obs_err_rates -= _np.dot(Jaff, intrinsic_rates['affine'])
 
-                rank = _np.linalg.matrix_rank(J)
+                intrinsic_hamiltonian_rates, rank = _solve_jacobian(J, obs_err_rates, fast_solve,
+                                                                    printer, "hamiltonian")
                 if rank < J.shape[1]:
                     if include_hamiltonian == "auto":
                         include_hamiltonian = False
                     else:
-                        _warnings.warn(("Idle tomography: hamiltonian-jacobian rank "
-                                        "(%d) < #intrinsic rates (%d)") % (rank, J.shape[1]))
+                        _warn_rank_deficient("hamiltonian", rank, J.shape[1])
 
                 if include_hamiltonian:  # could have been changed "auto" -> False above
-                    invJ = _np.linalg.pinv(J)
-                    intrinsic_hamiltonian_rates = _np.dot(invJ, obs_err_rates)
                     intrinsic_rates['hamiltonian'] = intrinsic_hamiltonian_rates
             elif jacmode == "together":
                 if include_affine:
-                    Jaff = _np.concatenate(Jaff_list, axis=0)
                     ham_aff_jac = _np.concatenate((J, Jaff), axis=1)
                 else:
                     ham_aff_jac = J
@@ -1373,19 +1955,34 @@ def do_idle_tomography(nqubits, dataset, max_lengths, pauli_basis_dicts, maxweig
             else:
                 sto_col = sto_row = 0
 
-            Jbig = _np.zeros((Nrows, Ncols), 'd')
-
-            obs_to_concat = []
-            if include_hamiltonian:
+            if include_hamiltonian and include_stochastic:
+                Jbig = _np.zeros((Nrows, Ncols), 'd')
                 Jbig[0:sto_row, 0:Ne] = ham_aff_jac[:, 0:Ne]
-                obs_to_concat.append(ham_aff_obs_err_rates)
                 if include_affine:
                     Jbig[0:sto_row, 2 * Ne:3 * Ne] = ham_aff_jac[:, Ne:]
-            if include_stochastic:
                 Jbig[sto_row:, sto_col:] = sto_aff_jac
-                obs_to_concat.append(sto_aff_obs_err_rates)
-
-            while _np.linalg.matrix_rank(Jbig) < Jbig.shape[1]:
+                obs_to_concat = [ham_aff_obs_err_rates, sto_aff_obs_err_rates]
+            elif include_hamiltonian:  # (affine rates require stochastic ones) so Jbig is just the hamiltonian jacobian
+                Jbig = ham_aff_jac
+                obs_to_concat = [ham_aff_obs_err_rates]
+            elif include_stochastic:  # Jbig is just the stochastic(/affine) jacobian
+                Jbig = sto_aff_jac
+                obs_to_concat = [sto_aff_obs_err_rates]
+            else:
+                Jbig = _np.zeros((Nrows, Ncols), 'd')
+                obs_to_concat = []
+
+            obs_err_rates = _np.concatenate(obs_to_concat)
+            if include_hamiltonian and include_stochastic and not include_affine:
+                #Jbig is block-diagonal (only affine rates couple the blocks), so solve each block separately
+                ham_rates, ham_rank = _solve_jacobian(ham_aff_jac, ham_aff_obs_err_rates, fast_solve,
+                                                      printer, "hamiltonian")
+                sto_rates, sto_rank = _solve_jacobian(sto_aff_jac, sto_aff_obs_err_rates, fast_solve,
+                                                      printer, "stochastic")
+                all_intrinsic_rates = _np.concatenate((ham_rates, sto_rates)); rank = ham_rank + sto_rank
+            else:
+                all_intrinsic_rates, rank = _solve_jacobian(Jbig, obs_err_rates, fast_solve, printer, "whole")
+            while rank < Jbig.shape[1]:
                 if include_affine == "auto":  # then drop affine
                     include_affine = False
                     Jbig = Jbig[:, 0:sto_col + Ne]
@@ -1397,16 +1994,10 @@ def do_idle_tomography(nqubits, dataset, max_lengths, pauli_basis_dicts, maxweig
                     Jbig = Jbig[:, 0:sto_col]
                 else:  # nothing to drop... warn if anything is left
                     if include_hamiltonian or include_stochastic or include_affine:
-                        rank = _np.linalg.matrix_rank(Jbig)
-                        _warnings.warn(("Idle tomography: whole-jacobian rank "
-                                        "(%d) < #intrinsic rates (%d)") % (rank, Jbig.shape[1]))
+                        _warn_rank_deficient("whole", rank, Jbig.shape[1])
                     break
-                if Jbig.shape[1] == 0: break  # nothing left (matrix_rank will fail!)
-
-            if Jbig.shape[1] > 0:  # if there's any jacobian left
-                invJ = _np.linalg.pinv(Jbig)
-                obs_err_rates = _np.concatenate(obs_to_concat)
-                all_intrinsic_rates = _np.dot(invJ, obs_err_rates)
+                if Jbig.shape[1] == 0: break  # nothing left to solve for
+                all_intrinsic_rates, rank = _solve_jacobian(Jbig, obs_err_rates, fast_solve, printer, "whole")
 
             off = 0
             if include_hamiltonian:
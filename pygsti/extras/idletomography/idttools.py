@@ -9,6 +9,7 @@
 """ Idle Tomography utility routines """
 
 import itertools as _itertools
+from functools import lru_cache as _lru_cache
 
 import numpy as _np
 
@@ -22,6 +23,8 @@ from pygsti.baseobjs.label import Label as _Label
 
 # maybe need to restructure in future - "tools" usually doesn't import "objects"
 
+_CACHE_SIZE = 64  # max. number of argument combinations retained by each of the lru caches below
+
 
 def alloutcomes(prep, meas, maxweight):
     """
@@ -38,20 +41,26 @@ def alloutcomes(prep, meas, maxweight):
     Returns
     -------
     list
-        A list of :class:`NQOutcome` objects.
+        A list of :class:`NQOutcome` objects.  These are cached and shared
+        between calls, so they must not be modified.
     """
     if not (0 < maxweight <= 2): raise NotImplementedError("Only maxweight <= 2 is currently supported")
     assert(prep.rep == meas.rep), "`prep` and `meas` must specify the same basis!"
     expected = ["0" if s1 == s2 else "1" for s1, s2 in zip(prep.signs, meas.signs)]
     #whether '0' or '1' outcome is expected, i.e. what is an "error"
+    return list(_alloutcomes_of_expected(''.join(expected), maxweight))
+
 
-    N = len(prep)  # == len(meas)
-    eoutcome = _pobjs.NQOutcome(''.join(expected))
+@_lru_cache(maxsize=_CACHE_SIZE)
+def _alloutcomes_of_expected(expected, maxweight):
+    """ Cached core of :function:`alloutcomes`: the outcomes only depend on the expected bit string """
+    N = len(expected)
+    eoutcome = _pobjs.NQOutcome(expected)
     if maxweight == 1:
-        return [eoutcome.flip(i) for i in range(N)]
+        return tuple(eoutcome.flip(i) for i in range(N))
     else:
-        return [eoutcome.flip(i) for i in range(N)] + \
-               [eoutcome.flip(i, j) for i in range(N) for j in range(i + 1, N)]
+        return tuple([eoutcome.flip(i) for i in range(N)]
+                     + [eoutcome.flip(i, j) for i in range(N) for j in range(i + 1, N)])
 
 
 def allerrors(nqubits, maxweight):
@@ -65,16 +74,23 @@ def allerrors(nqubits, maxweight):
     Returns
     -------
     list
-        A list of :class:`NQPauliOp` objects.
+        A list of :class:`NQPauliOp` objects.  These are cached and shared
+        between calls, so they must not be modified.
     """
     if not (0 < maxweight <= 2): raise NotImplementedError("Only maxweigth <= 2 is currently supported")
+    return list(_allerrors(nqubits, maxweight))
+
+
+@_lru_cache(maxsize=_CACHE_SIZE)
+def _allerrors(nqubits, maxweight):
+    """ Cached core of :function:`allerrors` """
     if maxweight == 1:
-        return [_pobjs.NQPauliOp.weight_1_pauli(nqubits, loc, p) for loc in range(nqubits) for p in range(3)]
+        return tuple(_pobjs.NQPauliOp.weight_1_pauli(nqubits, loc, p) for loc in range(nqubits) for p in range(3))
     else:
-        return [_pobjs.NQPauliOp.weight_1_pauli(nqubits, loc, p) for loc in range(nqubits) for p in range(3)] + \
-               [_pobjs.NQPauliOp.weight_2_pauli(nqubits, loc1, loc2, p1, p2) for loc1 in range(nqubits)
-                for loc2 in range(loc1 + 1, nqubits)
-                for p1 in range(3) for p2 in range(3)]
+        return tuple([_pobjs.NQPauliOp.weight_1_pauli(nqubits, loc, p) for loc in range(nqubits) for p in range(3)]
+                     + [_pobjs.NQPauliOp.weight_2_pauli(nqubits, loc1, loc2, p1, p2) for loc1 in range(nqubits)
+                        for loc2 in range(loc1 + 1, nqubits)
+                        for p1 in range(3) for p2 in range(3)])
 
 
 def allobservables(meas, maxweight):
@@ -91,17 +107,25 @@ def allobservables(meas, maxweight):
     Returns
     -------
     list
-        A list of :class:`NQPauliOp` objects.
+        A list of :class:`NQPauliOp` objects.  These are cached and shared
+        between calls, so they must not be modified.
     """
     if not (0 < maxweight <= 2): raise NotImplementedError("Only maxweight <= 2 is currently supported")
     #Note: returned observables always have '+' sign (i.e. .sign == +1).  We're
     # not interested in meas.signs - this is take into account when we compute the
     # expectation value of our observable given a prep & measurement fiducial.
+    return list(_allobservables_of_rep(''.join(meas.rep), maxweight))
+
+
+@_lru_cache(maxsize=_CACHE_SIZE)
+def _allobservables_of_rep(rep, maxweight):
+    """ Cached core of :function:`allobservables`: the observables only depend on the measured Paulis (not signs) """
+    N = len(rep)
     if maxweight == 1:
-        return [_pobjs.NQPauliOp(meas.rep).subpauli([i]) for i in range(len(meas))]
+        return tuple(_pobjs.NQPauliOp(rep).subpauli([i]) for i in range(N))
     else:
-        return [_pobjs.NQPauliOp(meas.rep).subpauli([i]) for i in range(len(meas))] + \
-               [_pobjs.NQPauliOp(meas.rep).subpauli([i, j]) for i in range(len(meas)) for j in range(i + 1, len(meas))]
+        return tuple([_pobjs.NQPauliOp(rep).subpauli([i]) for i in range(N)]
+                     + [_pobjs.NQPauliOp(rep).subpauli([i, j]) for i in range(N) for j in range(i + 1, N)])
 
 
 def tile_pauli_fidpairs(base_fidpairs, nqubits, maxweight):
@@ -22,6 +22,22 @@ def _commute_parity(pauli1, pauli2):
     return 1 if (pauli1 == "I" or pauli2 == "I" or pauli1 == pauli2) else -1
 
 
+#Integer codes of the 1-qubit Paulis, used by the array representations below
+PAULI_CODES = {'I': 0, 'X': 1, 'Y': 2, 'Z': 3}
+_PAULI_CODE_TRANSLATION = str.maketrans({P: chr(code) for P, code in PAULI_CODES.items()})
+
+
+def _pauli_codes(rep):
+    """ A (read-only) `int8` array of the `PAULI_CODES` of the letters in `rep` (a str or list) """
+    if isinstance(rep, str):
+        if rep.strip('IXYZ'):
+            raise ValueError("Invalid Pauli string %r: letters must be 'I', 'X', 'Y' or 'Z'" % rep)
+        return _np.frombuffer(rep.translate(_PAULI_CODE_TRANSLATION).encode('ascii'), _np.int8)
+    arr = _np.array([PAULI_CODES[P] for P in rep], _np.int8)
+    arr.flags.writeable = False
+    return arr
+
+
 class NQOutcome(object):
     """
     A string of 0's and 1's representing a definite outcome in the Z-basis.
@@ -118,10 +134,35 @@ class NQPauliState(object):
         if signs is None:
             signs = (0,) * len(self.rep)
         self.signs = signs
+        self._rep_arr = self._signs_arr = None  # computed when first needed
+
+    def __setstate__(self, state_dict):
+        self.__dict__.update(state_dict)
+        self._rep_arr = self._signs_arr = None  # recomputed when needed (and absent from older pickles)
 
     def __len__(self):
         return len(self.rep)
 
+    @property
+    def rep_arr(self):
+        """
+        The Pauli basis of each qubit as a (read-only) `int8` array,
+        using the integer codes 1=X, 2=Y and 3=Z (see `PAULI_CODES`).
+        """
+        if self._rep_arr is None:
+            self._rep_arr = _pauli_codes(self.rep)
+        return self._rep_arr
+
+    @property
+    def signs_arr(self):
+        """
+        The sign of each qubit's basis as a (read-only) `int8` array.
+        """
+        if self._signs_arr is None:
+            self._signs_arr = _np.array(self.signs, _np.int8)
+            self._signs_arr.flags.writeable = False
+        return self._signs_arr
+
     def __str__(self):
         sgn = {1: '+', -1: '-'}
         return "".join(["%s%s" % (sgn[s], let)
@@ -251,10 +292,25 @@ class NQPauliOp(object):
         """
         self.rep = string_rep
         self.sign = sign  # +/- 1
+        self._rep_arr = None  # computed when first needed
+
+    def __setstate__(self, state_dict):
+        self.__dict__.update(state_dict)
+        self._rep_arr = None  # recomputed when needed (and absent from older pickles)
 
     def __len__(self):
         return len(self.rep)
 
+    @property
+    def rep_arr(self):
+        """
+        The Pauli operator on each qubit as a (read-only) `int8` array,
+        using the integer codes 0=I, 1=X, 2=Y and 3=Z (see `PAULI_CODES`).
+        """
+        if self._rep_arr is None:
+            self._rep_arr = _pauli_codes(self.rep)
+        return self._rep_arr
+
     def __str__(self):
         return "%s%s" % ('-' if (self.sign == -1) else ' ', self.rep)
 
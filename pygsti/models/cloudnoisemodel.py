@@ -496,9 +496,7 @@ class CloudNoiseLayerRules(_LayerRules):
         if layerlbl in caches['complete-layers']: return caches['complete-layers'][layerlbl]
 
         if isinstance(layerlbl, _CircuitLabel):
-            op = self._create_op_for_circuitlabel(model, layerlbl)
-            caches['complete-layers'][layerlbl] = op
-            return op
+            return self._create_op_for_circuitlabel(model, layerlbl, caches['complete-layers'])
 
         Composed = _op.ComposedOp
         ExpErrorgen = _op.ExpErrorgenOp
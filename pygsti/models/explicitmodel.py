@@ -2228,9 +2228,7 @@ class ExplicitLayerRules(_LayerRules):
         """
         if layerlbl in caches['op-layers']: return caches['op-layers'][layerlbl]
         if isinstance(layerlbl, _CircuitLabel):
-            op = self._create_op_for_circuitlabel(model, layerlbl)
-            caches['op-layers'][layerlbl] = op
-            return op
+            return self._create_op_for_circuitlabel(model, layerlbl, caches['op-layers'])
         elif layerlbl in model.operations:
             return model.operations[layerlbl]
         else:
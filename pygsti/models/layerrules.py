@@ -26,7 +26,7 @@ class LayerRules(_NicelySerializable):
     tailored to a specific models.
     """
 
-    def _create_op_for_circuitlabel(self, model, circuitlbl):
+    def _create_op_for_circuitlabel(self, model, circuitlbl, cache=None):
         """
         A helper method for derived classes used for processing :class:`CircuitLabel` labels.
 
@@ -41,10 +41,17 @@ class LayerRules(_NicelySerializable):
         circuitlbl : CircuitLabel
             The (sub-circuit)^power to create an operator for.
 
+        cache : dict, optional
+            A dictionary of already-created operators, keyed by label.  If given,
+            the operator for `circuitlbl` is looked up in (and added to) this cache.
+
         Returns
         -------
         LinearOperator
         """
+        if cache is not None and circuitlbl in cache:
+            return cache[circuitlbl]
+
         if len(circuitlbl.components) != 1:  # works for 0 components too
             subCircuitOp = _op.ComposedOp([model.circuit_layer_operator(l, 'op') for l in circuitlbl.components],
                                           evotype=model.evotype, state_space=model.state_space)
@@ -58,6 +65,8 @@ class LayerRules(_NicelySerializable):
             finalOp = subCircuitOp
 
         model._init_virtual_obj(finalOp)  # so ret's gpindices get set, essential for being in cache
+        if cache is not None:
+            cache[circuitlbl] = finalOp
         return finalOp
 
     def prep_layer_operator(self, model, layerlbl, cache):
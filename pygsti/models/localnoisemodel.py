@@ -496,9 +496,8 @@ class _SimpleCompLayerRules(_LayerRules):
         add_idle = add_global_idle or add_padded_idle
 
         if isinstance(layerlbl, _CircuitLabel):
-            op = self._create_op_for_circuitlabel(model, layerlbl)
-            if self.use_op_caching: caches['complete-layers'][layerlbl] = op
-            return op
+            return self._create_op_for_circuitlabel(model, layerlbl,
+                                                    caches['complete-layers'] if self.use_op_caching else None)
 
         if len(components) == 1 and add_idle is False:
             ret = self._layer_component_operation(model, components[0], caches['op-layers'])
@@ -550,9 +549,10 @@ class _SimpleCompLayerRules(_LayerRules):
             return cache[complbl]
 
         #Note: currently we don't cache complbl because it's not the final
-        # label being created, but we could if it would improve performance.
+        # label being created, except for sub-circuit labels, whose (composed/repeated)
+        # operators are comparatively expensive to build.
         if isinstance(complbl, _CircuitLabel):
-            ret = self._create_op_for_circuitlabel(model, complbl)
+            ret = self._create_op_for_circuitlabel(model, complbl, cache if self.use_op_caching else None)
         elif complbl in model.operation_blks['layers']:
             ret = model.operation_blks['layers'][complbl]
         else:
@@ -56,6 +56,7 @@ extras = {
         'flake8'
     ],
     'interpygate': ['csaps'],
+    'idletomography_jit': ['numba'],
     'testing': [
         'coverage',
         'csaps',
@@ -0,0 +1,262 @@
+import itertools
+import pickle
+import threading
+import warnings
+from unittest import mock
+
+import numpy as np
+
+import pygsti.data as pdata
+from pygsti.baseobjs import Label as L
+from pygsti.circuits import Circuit
+from pygsti.extras.idletomography import idtcore, idttools, pauliobjs, _idtkernels
+from ...util import BaseCase
+
+_SEED = 1234
+
+prepDict = {'X': ('Gy',), 'Y': ('Gx',) * 3, 'Z': (),
+            '-X': ('Gy',) * 3, '-Y': ('Gx',), '-Z': ('Gx', 'Gx')}
+measDict = {'X': ('Gy',) * 3, 'Y': ('Gx',), 'Z': (),
+            '-X': ('Gy',), '-Y': ('Gx',) * 3, '-Z': ('Gx', 'Gx')}
+
+
+def _random_state(rng, nqubits, basis=None):
+    if basis is None:
+        basis = ''.join(rng.choice(list('XYZ'), nqubits))
+    return pauliobjs.NQPauliState(basis, [int(s) for s in rng.choice([1, -1], nqubits)])
+
+
+class IDTKernelTester(BaseCase):
+    """ Compares the vectorized jacobian row builders with the scalar `*_jac_element` functions """
+
+    def setUp(self):
+        self.rng = np.random.RandomState(_SEED)
+
+    def _kernel_variants(self):
+        # the default kernels (numba-compiled, when it's installed) in their serial & parallel forms,
+        # and each of the pure-Python loop and numpy fallbacks substituted for both
+        yield {'PARALLEL_THRESHOLD': _idtkernels.PARALLEL_THRESHOLD}
+        yield {'PARALLEL_THRESHOLD': 0}
+        for impl in ('_loops', '_numpy'):
+            yield {name + variant: getattr(_idtkernels, name + impl)
+                   for name in ('_affine_rows', '_ham_rows', '_affine_obs_rows')
+                   for variant in ('_serial', '_parallel')}
+
+    def _check_rows(self, nqubits):
+        errors = idttools.allerrors(nqubits, min(2, nqubits))
+        err_indices = np.array([e.rep_arr for e in errors])
+        err_xbits, err_zbits = idtcore._symplectic_bitmasks(err_indices)
+        for trial in range(5):
+            prep = _random_state(self.rng, nqubits)
+            meas = _random_state(self.rng, nqubits, prep.rep)
+            outcomes = idttools.alloutcomes(prep, meas, min(2, nqubits))
+            other_meas = _random_state(self.rng, nqubits)
+            observables = idttools.allobservables(other_meas, min(2, nqubits))
+            observables = observables + [pauliobjs.NQPauliOp(other_meas.rep, -1)]
+
+            sto = np.array([[idtcore.stochastic_jac_element(prep, e, meas, o) for e in errors] for o in outcomes])
+            aff = np.array([[idtcore.affine_jac_element(prep, e, meas, o) for e in errors] for o in outcomes])
+            ham = np.array([[idtcore.hamiltonian_jac_element(prep, e, obs) for e in errors] for obs in observables])
+            aff_obs = np.array([[idtcore.affine_jac_obs_element(prep, e, obs) for e in errors]
+                                for obs in observables])
+
+            for patches in self._kernel_variants():
+                with mock.patch.multiple(_idtkernels, **patches):
+                    self.assertArraysEqual(
+                        idtcore._jac_rows(prep, meas, outcomes, err_xbits, err_zbits, err_indices, False), sto)
+                    self.assertArraysEqual(
+                        idtcore._jac_rows(prep, meas, outcomes, err_xbits, err_zbits, err_indices, True),
+                        np.concatenate((sto, aff), axis=1))
+                    self.assertArraysEqual(idtcore._hamiltonian_jac_rows(prep, observables, err_indices), ham)
+                    self.assertArraysEqual(idtcore._affine_obs_jac_rows(prep, observables, err_indices), aff_obs)
+
+    def test_jac_rows_1Q(self):
+        self._check_rows(1)
+
+    def test_jac_rows_3Q(self):
+        self._check_rows(3)
+
+    def test_jac_rows_requires_distinct_outcomes(self):
+        prep = pauliobjs.NQPauliState('XZ', (1, 1))
+        errors = idttools.allerrors(2, 2)
+        err_indices = np.array([e.rep_arr for e in errors])
+        err_xbits, err_zbits = idtcore._symplectic_bitmasks(err_indices)
+        outcomes = [pauliobjs.NQOutcome('01'), pauliobjs.NQOutcome('01')]
+        with self.assertRaises(AssertionError):
+            idtcore._jac_rows(prep, prep, outcomes, err_xbits, err_zbits, err_indices, False)
+
+
+class IDTFitTester(BaseCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(_SEED)
+
+    def _check_fits(self, max_lengths, fit_order):
+        fit_data = [(list(self.rng.normal(size=len(max_lengths))), list(self.rng.uniform(0.5, 2, len(max_lengths))),
+                     list(self.rng.uniform(size=len(max_lengths)))) for i in range(6)]
+        infos = idtcore._fit_observed_err_rates(max_lengths, fit_data, fit_order)
+        self.assertEqual(len(infos), len(fit_data))
+        for info, (data, weights, errbars) in zip(infos, fit_data):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")  # polyfit warns about under-determined fits
+                coeffs = np.polyfit(max_lengths, data, fit_order, w=weights)
+            self.assertArraysAlmostEqual(info['fitCoeffs'], coeffs)
+            if fit_order == 1:
+                self.assertAlmostEqual(info['rate'], coeffs[0])
+            self.assertEqual(info['data'], data)
+            self.assertEqual(info['weights'], weights)
+            self.assertEqual(info['errbars'], errbars)
+
+    def test_fit_order_1(self):
+        self._check_fits([1, 2, 4, 8], 1)
+
+    def test_fit_order_2(self):
+        self._check_fits([1, 2, 4, 8], 2)
+
+    def test_underdetermined_fit(self):
+        self._check_fits([2, 2, 4], 2)
+
+    def test_no_fits(self):
+        self.assertEqual(idtcore._fit_observed_err_rates([1, 2], [], 1), [])
+
+
+class IDTSolveTester(BaseCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(_SEED)
+
+    def _check_solve(self, jac):
+        obs = self.rng.normal(size=jac.shape[0])
+        expected = np.dot(np.linalg.pinv(jac), obs)
+        for fast in (False, True):
+            x, rank = idtcore._solve_jacobian(jac, obs, fast)
+            self.assertArraysAlmostEqual(x, expected)
+            self.assertEqual(rank, np.linalg.matrix_rank(jac))
+
+    def test_full_rank(self):
+        self._check_solve(self.rng.normal(size=(20, 6)))
+
+    def test_rank_deficient(self):
+        jac = self.rng.normal(size=(20, 6))
+        jac[:, 4] = jac[:, 0] + jac[:, 1]
+        jac[:, 5] = 0
+        self._check_solve(jac)
+
+    def test_integer_jacobian(self):
+        jac = self.rng.randint(-1, 2, size=(30, 8)).astype(np.int8)
+        self._check_solve(jac)
+
+
+class IDTFidpairConversionTester(BaseCase):
+    def test_unconvertible_fidpairs_skipped(self):
+        nQ = 2
+        pauli_fidpairs = idtcore.idle_tomography_fidpairs(nQ, 2)
+        fidpairs = [(prep.to_circuit(prepDict), meas.to_circuit(measDict)) for prep, meas in pauli_fidpairs]
+        unconvertible = [(Circuit([L('Gcnot', (0, 1))], num_lines=nQ), fidpairs[0][1]),
+                         (fidpairs[0][0], Circuit([L('Gz', 0)], num_lines=nQ))]
+
+        converted = idtcore.fidpairs_to_pauli_fidpairs(fidpairs[0:3] + unconvertible + fidpairs[3:],
+                                                       (prepDict, measDict), nQ)
+        self.assertEqual([(str(prep), str(meas)) for prep, meas in converted],
+                         [(str(prep), str(meas)) for prep, meas in pauli_fidpairs])
+
+    def test_other_qubits_ignored(self):
+        # gates on qubits outside 0..nqubits-1 (even negative labels) don't affect the conversion
+        lines = (-1, 0, 1)
+        prep = Circuit([L('Gx', 0), L('Gx', 1), L('Gy', -1)], line_labels=lines)
+        meas = Circuit([L('Gy', 2)], line_labels=lines + (2,))
+        converted = idtcore.fidpairs_to_pauli_fidpairs([(prep, meas)], (prepDict, measDict), 2)
+        self.assertEqual([(str(p), str(m)) for p, m in converted], [('-Y-Y', '+Z+Z')])
+
+
+class IDTPauliObjTester(BaseCase):
+    def test_rep_arrays(self):
+        state = pauliobjs.NQPauliState('XZY', (1, -1, 1))
+        self.assertEqual(state.rep_arr.tolist(), [1, 3, 2])
+        self.assertEqual(state.signs_arr.tolist(), [1, -1, 1])
+        self.assertFalse(state.rep_arr.flags.writeable)
+        self.assertEqual(pauliobjs.NQPauliOp('IXYZ').rep_arr.tolist(), [0, 1, 2, 3])
+
+    def test_invalid_letters(self):
+        with self.assertRaises(ValueError):
+            pauliobjs.NQPauliOp('IXQ').rep_arr
+
+    def test_pickle(self):
+        state = pauliobjs.NQPauliState('XZ', (1, -1))
+        op = pauliobjs.NQPauliOp('IXY', -1)
+        state.rep_arr, op.rep_arr  # cache the arrays before pickling
+        state2 = pickle.loads(pickle.dumps(state))
+        op2 = pickle.loads(pickle.dumps(op))
+        self.assertEqual(state2, state)
+        self.assertEqual(state2.rep_arr.tolist(), [1, 3])
+        self.assertEqual(state2.signs_arr.tolist(), [1, -1])
+        self.assertEqual(op2, op)
+        self.assertEqual(op2.rep_arr.tolist(), [0, 1, 2])
+
+    def test_unpickle_without_cached_arrays(self):
+        # objects pickled before the arrays were cached have no `_rep_arr` or `_signs_arr` attributes
+        state = pauliobjs.NQPauliState.__new__(pauliobjs.NQPauliState)
+        state.__setstate__({'rep': 'XY', 'signs': (1, -1)})
+        self.assertEqual(state.rep_arr.tolist(), [1, 2])
+        self.assertEqual(state.signs_arr.tolist(), [1, -1])
+        op = pauliobjs.NQPauliOp.__new__(pauliobjs.NQPauliOp)
+        op.__setstate__({'rep': 'ZI', 'sign': 1})
+        self.assertEqual(op.rep_arr.tolist(), [3, 0])
+
+
+class IDTAnalysisTester(BaseCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.nQ = 2
+        cls.max_lengths = [0, 1, 2, 4]
+        circuits = idtcore.make_idle_tomography_list(cls.nQ, cls.max_lengths, (prepDict, measDict),
+                                                     maxweight=2, include_affine=True)
+        outcomes = [''.join(bits) for bits in itertools.product('01', repeat=cls.nQ)]
+        rng = np.random.RandomState(_SEED)
+        cls.ds = pdata.DataSet(outcome_labels=outcomes)
+        for c in circuits:
+            counts = rng.multinomial(1000, rng.dirichlet(np.ones(len(outcomes))))
+            cls.ds.add_count_dict(c, {o: int(n) for o, n in zip(outcomes, counts)})
+        cls.ds.done_adding_data()
+
+    def _run(self, **advanced):
+        return idtcore.do_idle_tomography(self.nQ, self.ds, self.max_lengths, (prepDict, measDict), maxweight=2,
+                                          include_hamiltonian=True, include_stochastic=True, include_affine=True,
+                                          advanced_options=advanced)
+
+    def _assertSameResults(self, results, serial):
+        self.assertEqual(set(results.intrinsic_rates.keys()), set(serial.intrinsic_rates.keys()))
+        for typ, rates in serial.intrinsic_rates.items():
+            self.assertArraysAlmostEqual(results.intrinsic_rates[typ], rates)
+        for typ, infos_by_fidpair in serial.observed_rate_infos.items():
+            self.assertEqual(len(results.observed_rate_infos[typ]), len(infos_by_fidpair))
+            for ifp, infos in enumerate(infos_by_fidpair):
+                self.assertEqual(list(results.observed_rate_infos[typ][ifp].keys()), list(infos.keys()))
+                for key, info in infos.items():
+                    self.assertAlmostEqual(results.observed_rate_infos[typ][ifp][key]['rate'], info['rate'])
+
+    def test_num_processes(self):
+        self._assertSameResults(self._run(num_processes=2), self._run())
+
+    def test_num_threads(self):
+        self._assertSameResults(self._run(num_threads=3), self._run())
+
+    def test_num_threads_failure(self):
+        # an error while fitting stops the thread pool (joining its threads) before propagating
+        num_threads_before = threading.active_count()
+        with mock.patch.object(idtcore, '_diffbasis_fit_data', side_effect=ValueError("fit failed")):
+            with self.assertRaises(ValueError):
+                self._run(num_threads=3)
+        self.assertEqual(threading.active_count(), num_threads_before)
+
+    def test_fast_solve(self):
+        self._assertSameResults(self._run(**{'fast solve': True}), self._run())
+
+    def test_jacobian_row_dtypes(self):
+        # the public jacobian rows are independent (writeable) arrays of the same dtypes as always,
+        # whatever compact dtypes are used for the jacobians internally
+        results = self._run()
+        for typ, key, dtype in (('samebasis', 'jacobian row', np.int64), ('diffbasis', 'jacobian row', np.float64),
+                                ('diffbasis', 'affine jacobian row', np.int64)):
+            for infos in results.observed_rate_infos[typ]:
+                for info in infos.values():
+                    self.assertEqual(info[key].dtype, dtype)
+                    self.assertTrue(info[key].flags.writeable)
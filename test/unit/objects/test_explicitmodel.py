@@ -2,6 +2,7 @@ import numpy as np
 
 import pygsti.models.explicitmodel as mdl
 from pygsti.baseobjs import ExplicitStateSpace
+from pygsti.circuits import Circuit
 from pygsti.models.modelconstruction import create_explicit_model_from_expressions, create_operation
 from pygsti.modelpacks.legacy import std1Q_XYI as std
 from ..util import BaseCase
@@ -33,6 +34,36 @@ class ExplicitOpModelStrictAccessTester(BaseCase):
             self.model['rho0']
 
 
+class ExplicitOpModelCircuitLabelTester(BaseCase):
+    def setUp(self):
+        self.model = std.target_model().depolarize(op_noise=0.01, spam_noise=0.01)
+        self.lbl = Circuit(['Gx', 'Gy']).to_label(nreps=3)
+        self.circuit = Circuit(['Gi', self.lbl, 'Gx'])
+        self.flat_circuit = Circuit(['Gi'] + ['Gx', 'Gy'] * 3 + ['Gx'])
+
+    def test_circuitlabel_op_is_cached(self):
+        op = self.model.circuit_layer_operator(self.lbl, 'op')
+        self.assertIs(self.model.circuit_layer_operator(self.lbl, 'op'), op)
+
+        single_lbl = Circuit(['Gx']).to_label()
+        self.assertIs(self.model.circuit_layer_operator(single_lbl, 'op'),
+                      self.model.circuit_layer_operator(single_lbl, 'op'))
+
+    def test_circuitlabel_probabilities(self):
+        def check_probs():
+            probs = self.model.probabilities(self.circuit)
+            flat_probs = self.model.probabilities(self.flat_circuit)
+            for outcome, p in flat_probs.items():
+                self.assertAlmostEqual(probs[outcome], p)
+
+        check_probs()
+        op = self.model.circuit_layer_operator(self.lbl, 'op')
+        v = self.model.to_vector() + np.random.RandomState(1234).normal(0, 0.01, self.model.num_params)
+        self.model.from_vector(v)
+        self.assertIs(self.model.circuit_layer_operator(self.lbl, 'op'), op)  # cached op sees the new parameters
+        check_probs()
+
+
 class ExplicitOpModelToolTester(BaseCase):
     def setUp(self):
         mdl.ExplicitOpModel._strict = False